@@ -3,13 +3,17 @@ TRACES Pro - Intervention Orchestrator Agent Models
 Autonomous agent system for proactive student support
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Index, insert, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
 from database import Base
 
+# Pre-parsed binary JSON on PostgreSQL, plain JSON everywhere else (SQLite dev DB)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 # ============================================================================
 # ENUMS
 # ============================================================================
@@ -51,6 +55,27 @@ class ActionStatus(str, enum.Enum):
     FAILED = "failed"
     SKIPPED = "skipped"
 
+# ============================================================================
+# MIXINS
+# ============================================================================
+
+class BulkInsertMixin:
+    """Multi-row INSERTs for high-volume agent tables"""
+    
+    BULK_CHUNK_SIZE = 1000
+    
+    @classmethod
+    def bulk_insert(cls, session, rows: list) -> list:
+        """Insert column mappings in chunked multi-values statements, returning new ids in row order"""
+        ids = []
+        for start in range(0, len(rows), cls.BULK_CHUNK_SIZE):
+            result = session.execute(
+                insert(cls).returning(cls.id, sort_by_parameter_order=True),
+                rows[start:start + cls.BULK_CHUNK_SIZE]
+            )
+            ids.extend(result.scalars().all())
+        return ids
+
 # ============================================================================
 # AGENT MODELS
 # ============================================================================
@@ -58,6 +83,9 @@ class ActionStatus(str, enum.Enum):
 class AgentSession(Base):
     """IOA session tracking"""
     __tablename__ = "agent_sessions"
+    __table_args__ = (
+        Index("ix_agent_sessions_student_status", "student_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -70,6 +98,7 @@ class AgentSession(Base):
     current_risk_score = Column(Float, nullable=False)
     risk_trend = Column(String(50), nullable=True)  # increasing, stable, decreasing
     risk_velocity = Column(Float, nullable=True)  # Rate of change
+    department = Column(String(100), nullable=True, index=True)  # Promoted from context for filtering
     
     # Goals
     goal = Column(Text, nullable=False)
@@ -77,9 +106,9 @@ class AgentSession(Base):
     target_deadline = Column(DateTime, nullable=True)
     
     # Agent Memory (JSON)
-    observations = Column(JSON, nullable=True)
-    hypotheses = Column(JSON, nullable=True)
-    context = Column(JSON, nullable=True)
+    observations = Column(JSONType, nullable=True)
+    hypotheses = Column(JSONType, nullable=True)
+    context = Column(JSONType, nullable=True)
     
     # Timestamps
     started_at = Column(DateTime, default=datetime.utcnow)
@@ -87,12 +116,15 @@ class AgentSession(Base):
     last_action_at = Column(DateTime, nullable=True)
     
     # Relationships
-    student = relationship("Student")
-    intervention_plans = relationship("InterventionPlan", back_populates="session")
+    student = relationship("Student", lazy="joined")
+    intervention_plans = relationship("InterventionPlan", back_populates="session", lazy="selectin")
 
 class InterventionPlan(Base):
     """Agent-generated intervention plans"""
     __tablename__ = "intervention_plans"
+    __table_args__ = (
+        Index("ix_intervention_plans_session_approval", "session_id", "approval_status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("agent_sessions.id"), nullable=False)
@@ -104,8 +136,8 @@ class InterventionPlan(Base):
     description = Column(Text, nullable=False)
     
     # Agent Reasoning
-    reasoning = Column(JSON, nullable=False)  # Why this plan
-    identified_causes = Column(JSON, nullable=True)  # Root causes
+    reasoning = Column(JSONType, nullable=False)  # Why this plan
+    identified_causes = Column(JSONType, nullable=True)  # Root causes
     expected_outcome = Column(Text, nullable=True)
     
     # Approval
@@ -119,7 +151,7 @@ class InterventionPlan(Base):
     estimated_duration_days = Column(Integer, nullable=True)
     
     # Success Criteria
-    success_metrics = Column(JSON, nullable=True)
+    success_metrics = Column(JSONType, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -128,13 +160,17 @@ class InterventionPlan(Base):
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
-    session = relationship("AgentSession", back_populates="intervention_plans")
-    actions = relationship("AgentAction", back_populates="plan")
-    outcomes = relationship("InterventionOutcome", back_populates="plan")
+    session = relationship("AgentSession", back_populates="intervention_plans", lazy="joined")
+    actions = relationship("AgentAction", back_populates="plan", lazy="selectin")
+    outcomes = relationship("InterventionOutcome", back_populates="plan", lazy="selectin")
 
-class AgentAction(Base):
+class AgentAction(BulkInsertMixin, Base):
     """Individual actions in an intervention plan"""
     __tablename__ = "agent_actions"
+    __table_args__ = (
+        Index("ix_agent_actions_plan_status_seq", "plan_id", "status", "sequence_order"),
+        Index("ix_agent_actions_plan_seq", "plan_id", "sequence_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("intervention_plans.id"), nullable=False)
@@ -149,11 +185,11 @@ class AgentAction(Base):
     
     # Tool/Agent Assignment
     delegated_to = Column(String(100), nullable=False)  # Which sub-agent
-    tool_parameters = Column(JSON, nullable=True)
+    tool_parameters = Column(JSONType, nullable=True)
     
     # Execution
     status = Column(SQLEnum(ActionStatus), default=ActionStatus.PENDING)
-    execution_log = Column(JSON, nullable=True)
+    execution_log = Column(JSONType, nullable=True)
     error_message = Column(Text, nullable=True)
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
@@ -162,7 +198,7 @@ class AgentAction(Base):
     depends_on_action_id = Column(Integer, ForeignKey("agent_actions.id"), nullable=True)
     
     # Results
-    result_data = Column(JSON, nullable=True)
+    result_data = Column(JSONType, nullable=True)
     success = Column(Boolean, nullable=True)
     
     # Timestamps
@@ -171,7 +207,7 @@ class AgentAction(Base):
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
-    plan = relationship("InterventionPlan", back_populates="actions")
+    plan = relationship("InterventionPlan", back_populates="actions", lazy="joined")
 
 class InterventionOutcome(Base):
     """Verification of intervention results"""
@@ -192,13 +228,13 @@ class InterventionOutcome(Base):
     chat_sentiment_delta = Column(Float, nullable=True)
     
     # Success Indicators
-    goals_achieved = Column(JSON, nullable=True)
+    goals_achieved = Column(JSONType, nullable=True)
     success_rate = Column(Float, nullable=True)  # 0.0 to 1.0
     
     # Agent Learning
     effectiveness_score = Column(Float, nullable=True)
-    lessons_learned = Column(JSON, nullable=True)
-    recommended_adjustments = Column(JSON, nullable=True)
+    lessons_learned = Column(JSONType, nullable=True)
+    recommended_adjustments = Column(JSONType, nullable=True)
     
     # Next Steps
     requires_plan_b = Column(Boolean, default=False)
@@ -208,11 +244,14 @@ class InterventionOutcome(Base):
     measured_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    plan = relationship("InterventionPlan", back_populates="outcomes")
+    plan = relationship("InterventionPlan", back_populates="outcomes", lazy="joined")
 
-class AgentObservation(Base):
+class AgentObservation(BulkInsertMixin, Base):
     """Continuous monitoring observations"""
     __tablename__ = "agent_observations"
+    __table_args__ = (
+        Index("ix_agent_obs_student_time", "student_id", "observed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -225,8 +264,9 @@ class AgentObservation(Base):
     metric_text = Column(Text, nullable=True)
     
     # Context
-    context_data = Column(JSON, nullable=True)
+    context_data = Column(JSONType, nullable=True)
     anomaly_detected = Column(Boolean, default=False)
+    anomaly_type = Column(String(100), nullable=True, index=True)  # Promoted from context for filtering
     severity = Column(Float, nullable=True)  # 0.0 to 1.0
     
     # Patterns
@@ -237,6 +277,9 @@ class AgentObservation(Base):
 class GovConnectSignal(Base):
     """Aggregated signals for policy makers"""
     __tablename__ = "govconnect_signals"
+    __table_args__ = (
+        Index("ix_govconnect_evidence_gin", "evidence", postgresql_using="gin", postgresql_ops={"evidence": "jsonb_path_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -256,7 +299,7 @@ class GovConnectSignal(Base):
     
     # Policy Recommendation
     recommended_action = Column(Text, nullable=True)
-    evidence = Column(JSON, nullable=False)
+    evidence = Column(JSONType, nullable=False)
     
     # Status
     reported_to_authorities = Column(Boolean, default=False)
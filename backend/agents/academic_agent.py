@@ -4,9 +4,63 @@ Detects bureaucratic academic friction (not academic failure)
 Focus: attendance penalties, deadline conflicts, administrative warnings
 """
 
+import numpy as np
 from typing import List, Dict
-from models import StudentEvent
-from datetime import datetime, timedelta
+from models import StudentEvent, EVENT_TYPE_CODES, EVENT_TYPE_NAMES
+from agents.features import EventBatch, select_domain_events
+from datetime import datetime
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel runs as plain NumPy/Python
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+CLUSTER_WINDOW_SECONDS = 14 * 86400  # Events within 2 weeks
+
+ACADEMIC_TYPES = (
+    'attendance_warning',
+    'deadline_conflict',
+    'admin_warning',
+    'resource_access',
+    'registration_block'
+)
+ACADEMIC_CODES = np.array([EVENT_TYPE_CODES[t] for t in ACADEMIC_TYPES], dtype=np.int8)
+
+# Pre-bound comment templates
+LOW_COMMENT = "Low academic friction - isolated administrative events"
+MODERATE_CLUSTERED_TEMPLATE = "Moderate friction with {clusters} clustered events - compounding barriers".format
+MODERATE_TEMPLATE = "Moderate academic bureaucratic pressure ({count} events)".format
+HIGH_TEMPLATE = "High academic friction - {count} events including {clusters} rapid-succession barriers".format
+
+
+@njit(cache=True)
+def _score(severities, timestamps):
+    """Compiled scoring kernel: returns (risk, confidence, clustered_events, avg_severity)"""
+    event_count = severities.shape[0]
+    
+    # Analyze clustering - multiple events in short time = higher friction
+    ordered = np.sort(timestamps)
+    clustered_events = 0
+    for i in range(event_count - 1):
+        if ordered[i + 1] - ordered[i] <= CLUSTER_WINDOW_SECONDS:
+            clustered_events += 1
+    
+    # Calculate risk
+    base_risk = min(event_count / 6.0, 0.9)  # Normalize to 6 events max
+    cluster_penalty = min(clustered_events * 0.15, 0.3)  # Up to 30% additional
+    
+    # Severity weighting
+    avg_severity = severities.sum() / event_count
+    
+    risk = min(base_risk + cluster_penalty, 1.0) * avg_severity
+    
+    # Confidence increases with more data points
+    confidence = min(0.65 + (event_count * 0.04), 0.92)
+    
+    return risk, confidence, clustered_events, avg_severity
 
 
 class AcademicAgent:
@@ -19,7 +73,7 @@ class AcademicAgent:
         self.name = "AcademicAgent"
         self.weight = 0.2
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], batch: EventBatch = None) -> Dict:
         """
         Evaluate academic friction events
         
@@ -29,13 +83,13 @@ class AcademicAgent:
         - Administrative warnings
         - Access restrictions to academic resources
         """
-        academic_events = [
-            e for e in events 
-            if e.event_type in ['attendance_warning', 'deadline_conflict', 
-                               'admin_warning', 'resource_access', 'registration_block']
-        ]
+        if batch is not None:
+            academic = batch.select(ACADEMIC_CODES)
+            codes = academic.event_type
+        else:
+            academic_events, codes = select_domain_events(events, ACADEMIC_CODES)
         
-        if not academic_events:
+        if not len(codes):
             return {
                 'agent': self.name,
                 'risk': 0.0,
@@ -44,22 +98,19 @@ class AcademicAgent:
                 'details': {'event_count': 0}
             }
         
-        event_count = len(academic_events)
-        
-        # Analyze clustering - multiple events in short time = higher friction
-        clustered_events = self._detect_clustering(academic_events)
-        
-        # Calculate risk
-        base_risk = min(event_count / 6.0, 0.9)  # Normalize to 6 events max
-        cluster_penalty = min(clustered_events * 0.15, 0.3)  # Up to 30% additional
-        
-        # Severity weighting
-        avg_severity = sum(e.severity for e in academic_events) / event_count
+        event_count = len(codes)
         
-        risk = min(base_risk + cluster_penalty, 1.0) * avg_severity
+        # Columnar copies of the event attributes for the compiled kernel
+        if batch is not None:
+            severities = academic.severity
+            timestamps = academic.timestamp_ns / 1e9
+        else:
+            severities = np.fromiter((e.severity for e in academic_events), dtype=np.float64, count=event_count)
+            timestamps = np.fromiter((e.timestamp.timestamp() for e in academic_events), dtype=np.float64, count=event_count)
         
-        # Confidence increases with more data points
-        confidence = min(0.65 + (event_count * 0.04), 0.92)
+        risk, confidence, clustered_events, avg_severity = _score(severities, timestamps)
+        risk, confidence, avg_severity = float(risk), float(confidence), float(avg_severity)
+        clustered_events = int(clustered_events)
         
         comment = self._generate_comment(event_count, clustered_events, risk)
         
@@ -72,41 +123,22 @@ class AcademicAgent:
                 'event_count': event_count,
                 'clustered_events': clustered_events,
                 'avg_severity': round(avg_severity, 3),
-                'friction_types': self._categorize_friction(academic_events)
+                'friction_types': self._categorize_friction(codes)
             }
         }
     
-    def _detect_clustering(self, events: List[StudentEvent]) -> int:
-        """Detect if events cluster in time (indicates compounding friction)"""
-        if len(events) < 2:
-            return 0
-        
-        # Sort by timestamp
-        sorted_events = sorted(events, key=lambda x: x.timestamp)
-        
-        clusters = 0
-        for i in range(len(sorted_events) - 1):
-            time_diff = sorted_events[i + 1].timestamp - sorted_events[i].timestamp
-            if time_diff <= timedelta(days=14):  # Events within 2 weeks
-                clusters += 1
-        
-        return clusters
-    
     def _generate_comment(self, count: int, clusters: int, risk: float) -> str:
         """Generate contextual comment"""
         if risk < 0.3:
-            return "Low academic friction - isolated administrative events"
+            return LOW_COMMENT
         elif risk < 0.6:
             if clusters > 0:
-                return f"Moderate friction with {clusters} clustered events - compounding barriers"
-            return f"Moderate academic bureaucratic pressure ({count} events)"
+                return MODERATE_CLUSTERED_TEMPLATE(clusters=clusters)
+            return MODERATE_TEMPLATE(count=count)
         else:
-            return f"High academic friction - {count} events including {clusters} rapid-succession barriers"
+            return HIGH_TEMPLATE(count=count, clusters=clusters)
     
-    def _categorize_friction(self, events: List[StudentEvent]) -> Dict[str, int]:
-        """Break down friction by category"""
-        categories = {}
-        for event in events:
-            event_type = event.event_type
-            categories[event_type] = categories.get(event_type, 0) + 1
-        return categories
\ No newline at end of file
+    def _categorize_friction(self, codes: np.ndarray) -> Dict[str, int]:
+        """Break down friction by category (codes are EVENT_TYPE_CODES values)"""
+        counts = np.bincount(codes)
+        return {EVENT_TYPE_NAMES[code]: int(count) for code, count in enumerate(counts) if count}
\ No newline at end of file
@@ -4,36 +4,48 @@ Detects academic bureaucratic friction using machine learning
 """
 
 import numpy as np
+from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
 
-from models import StudentEvent
-from agents.features import extract_domain_features
+from models import StudentEvent, EVENT_TYPE_CODES
+from agents.features import extract_features, select_domain_events
+from agents.linear_risk import LinearRiskMixin, load_artifacts
 from utils.rag import DomainRAG
 from utils.llm import get_llm
 
 
-class AcademicAgentML:
+MODEL_PATH = 'models/academic_agent.pkl'
+SCALER_PATH = 'models/academic_scaler.pkl'
+
+
+# Pre-trained model/scaler, loaded once per process
+_MODEL, _SCALER = load_artifacts(MODEL_PATH, SCALER_PATH, "AcademicAgent")
+
+
+class AcademicAgentML(LinearRiskMixin):
     """
     Academic friction agent with ML model, RAG, and LLM reasoning.
     """
     
+    # Domain-specific event types (class constant: no per-instance allocation)
+    DOMAIN_TYPES = frozenset({
+        'attendance_warning',
+        'deadline_conflict',
+        'admin_warning',
+        'resource_access',
+        'registration_block'
+    })
+    DOMAIN_CODES = np.array(sorted(EVENT_TYPE_CODES[t] for t in DOMAIN_TYPES), dtype=np.int8)
+    
     def __init__(self):
         self.name = "AcademicAgent"
         self.weight = 0.20
         
-        # Domain-specific event types
-        self.domain_types = [
-            'attendance_warning',
-            'deadline_conflict',
-            'admin_warning',
-            'resource_access',
-            'registration_block'
-        ]
-        
         # ML Model
         self.model = LogisticRegression(random_state=42, max_iter=1000)
         self.scaler = StandardScaler()
@@ -45,58 +57,70 @@ class AcademicAgentML:
         # LLM
         self.llm = get_llm()
         
+        # Per-instance memoization of the expensive steps; the RAG query only
+        # depends on the event count, and features only on event content + day
+        self._feature_cache = {}
+        self._rag_for_count = lru_cache(maxsize=512)(self._retrieve_rag)
+        self._explain = lru_cache(maxsize=512)(self._explain_uncached)
+        
         # Try to load pre-trained model
         self._load_model()
     
     def _load_model(self):
-        """Load pre-trained model if available."""
-        model_path = 'models/academic_agent.pkl'
-        scaler_path = 'models/academic_scaler.pkl'
-        
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
-            try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                self.model_trained = True
-            except Exception as e:
-                pass
+        """Attach the process-wide pre-trained model if available."""
+        if _MODEL is not None:
+            self._attach_model(_MODEL, _SCALER)
     
     def train(self, X: np.ndarray, y: np.ndarray):
         """Train the ML model."""
         if len(X) < 2:
             return
         
-        X_scaled = self.scaler.fit_transform(X)
-        self.model.fit(X_scaled, y)
-        self.model_trained = True
+        self._fit(X, y)
     
     def save_model(self):
         """Save trained model to disk."""
         os.makedirs('models', exist_ok=True)
-        with open('models/academic_agent.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
-        with open('models/academic_scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
+        joblib.dump(self.model, MODEL_PATH, compress=0)
+        joblib.dump(self.scaler, SCALER_PATH, compress=0)
+    
+    def _retrieve_rag(self, event_count: int) -> str:
+        """RAG retrieval behind the per-count cache."""
+        return self.rag.retrieve_context(f"Academic events: {event_count} events", top_k=2)
+    
+    def _explain_uncached(self, risk: float, feature_items: tuple, rag_context: str) -> str:
+        """LLM explanation behind the (risk, features, context) cache."""
+        return self.llm.explain_risk(
+            self.name,
+            risk,
+            dict(feature_items),
+            context=f"RAG Context:\n{rag_context}"
+        )
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
-        """Evaluate academic friction with ML + RAG + LLM."""
-        academic_events = [e for e in events if e.event_type in self.domain_types]
-        features = extract_domain_features(events, self.domain_types)
+    def _domain_features(self, events: List[StudentEvent]):
+        """Filter academic events and extract (memoized) domain features."""
+        academic_events, _ = select_domain_events(events, self.DOMAIN_CODES)
         
-        # ML Prediction
-        if self.model_trained and len(features) > 0:
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            risk_prob = self.model.predict_proba(features_scaled)[0][1]
-            ml_confidence = max(self.model.predict_proba(features_scaled)[0])
-        else:
-            risk_prob = self._heuristic_risk(academic_events)
-            ml_confidence = 0.6
+        # Recency features are whole days since each event, and each age rolls over at
+        # that event's time of day; keying on the ages themselves keeps hits exact
+        now = datetime.utcnow()
+        features_key = tuple(
+            (e.event_type, e.severity, e.timestamp, (now - e.timestamp).days) for e in academic_events
+        )
+        features = self._feature_cache.get(features_key)
+        if features is None:
+            features = extract_features(academic_events, now)
+            if len(self._feature_cache) >= 512:
+                self._feature_cache.clear()
+            self._feature_cache[features_key] = features
         
+        return academic_events, features
+    
+    def _build_output(self, academic_events: List[StudentEvent], features: np.ndarray,
+                      risk_prob: float, ml_confidence: float, explain: bool = True) -> Dict:
+        """Attach RAG + LLM reasoning (or the request for it) to a risk prediction."""
         # RAG Context
-        query = f"Academic events: {len(academic_events)} events"
-        rag_context = self.rag.retrieve_context(query, top_k=2)
+        rag_context = self._rag_for_count(len(academic_events))
         
         # LLM Reasoning
         feature_dict = {
@@ -105,14 +129,14 @@ class AcademicAgentML:
             'max_severity': float(features[2])
         }
         
-        llm_explanation = self.llm.explain_risk(
-            self.name,
-            risk_prob,
-            feature_dict,
-            context=f"RAG Context:\n{rag_context}"
-        )
+        # Prompt prints the score at 2 decimals, so rounding loses nothing
+        llm_explanation = self._explain(
+            round(float(risk_prob), 2),
+            tuple(feature_dict.items()),
+            rag_context
+        ) if explain else None
         
-        return {
+        output = {
             'agent': self.name,
             'risk': round(float(risk_prob), 3),
             'confidence': round(float(ml_confidence), 3),
@@ -123,6 +147,62 @@ class AcademicAgentML:
                 'max_severity': round(float(features[2]), 3)
             }
         }
+        if not explain:
+            output['llm_request'] = {
+                'agent_name': self.name,
+                'risk_score': float(risk_prob),
+                'features': feature_dict,
+                'context': f"RAG Context:\n{rag_context}"
+            }
+        return output
+    
+    def evaluate(self, events: List[StudentEvent], explain: bool = True) -> Dict:
+        """Evaluate academic friction with ML + RAG + LLM (explain=False defers the LLM call)."""
+        academic_events, features = self._domain_features(events)
+        
+        # ML Prediction
+        if self.model_trained and len(features) > 0:
+            probs = self._predict_proba(features.reshape(1, -1))[0]
+            risk_prob = probs[1]
+            ml_confidence = probs.max()
+        else:
+            risk_prob = self._heuristic_risk(academic_events)
+            ml_confidence = 0.6
+        
+        return self._build_output(academic_events, features, risk_prob, ml_confidence, explain)
+    
+    def evaluate_batch(self, batches: List[List[StudentEvent]]) -> List[Dict]:
+        """
+        Evaluate several students at once.
+        
+        Features are stacked into one matrix so scaling and scoring
+        run once for the whole batch instead of once per student.
+        
+        Args:
+            batches: One event list per student
+            
+        Returns:
+            One result dict per student, in input order
+        """
+        if not batches:
+            return []
+        
+        extracted = [self._domain_features(events) for events in batches]
+        
+        if self.model_trained:
+            X = np.vstack([features for _, features in extracted])
+            probs = self._predict_proba(X)
+            risk_probs = probs[:, 1]
+            ml_confidences = probs.max(axis=1)
+        else:
+            risk_probs = [self._heuristic_risk(academic_events) for academic_events, _ in extracted]
+            ml_confidences = [0.6] * len(extracted)
+        
+        return [
+            self._build_output(academic_events, features, risk_prob, ml_confidence)
+            for (academic_events, features), risk_prob, ml_confidence
+            in zip(extracted, risk_probs, ml_confidences)
+        ]
     
     def _heuristic_risk(self, events: List[StudentEvent]) -> float:
         """Fallback heuristic risk calculation."""
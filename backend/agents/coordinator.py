@@ -4,6 +4,11 @@ Synthesizes multi-agent outputs and makes final decisions
 Respects ethics agent veto power
 """
 
+import numpy as np
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from agents.financial_agent import FinancialAgent
 from agents.academic_agent import AcademicAgent
@@ -12,6 +17,34 @@ from agents.language_agent import LanguageAgent
 from agents.uncertainty_agent import UncertaintyAgent
 from agents.ethics_agent import EthicsAgent
 from models import StudentEvent
+from agents.features import EventBatch
+
+
+# Assigned weights for aggregate risk (ethics agent excluded)
+AGGREGATE_WEIGHTS = {
+    'FinancialAgent': 0.25,
+    'AcademicAgent': 0.20,
+    'ResidentialAgent': 0.20,
+    'LanguageAgent': 0.15,
+    'UncertaintyAgent': 0.20  # Uncertainty as a risk factor
+}
+
+
+# Result cache in front of analyze_student (dashboards refresh the same inputs)
+ANALYSIS_CACHE_SIZE = 10_000
+ANALYSIS_CACHE_TTL_SECONDS = 300
+
+# Display names without the "Agent" suffix, resolved once
+SHORT_NAMES = {name: name.replace('Agent', '') for name in AGGREGATE_WEIGHTS}
+
+# Pre-bound justification templates per decision
+JUSTIFICATION_TEMPLATES = {
+    "NO_ACTION": "No intervention warranted (aggregate risk: {risk:.2f})".format,
+    "WATCH": "Monitor situation - elevated {names} friction (risk: {risk:.2f})".format,
+    "SOFT_OUTREACH": "Suggest gentle check-in - notable {names} barriers (risk: {risk:.2f})".format,
+    "ESCALATE_TO_HUMAN": "Human counselor recommended - significant {names} friction (risk: {risk:.2f})".format,
+}
+WATCH_QUIET_TEMPLATE = "Low-moderate friction detected (risk: {risk:.2f}) - watchful waiting".format
 
 
 class CoordinatorAgent:
@@ -41,6 +74,19 @@ class CoordinatorAgent:
         self.language_agent = LanguageAgent()
         self.uncertainty_agent = UncertaintyAgent()
         self.ethics_agent = EthicsAgent()
+        
+        # Domain agents only share the input events, so they run side by side
+        self.domain_agents = [
+            self.financial_agent,
+            self.academic_agent,
+            self.residential_agent,
+            self.language_agent
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.domain_agents))
+        
+        # LRU of cache_key -> (expires_at, result)
+        self._analysis_cache = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
     
     def analyze_student(self, events: List[StudentEvent], student_context: Dict = None) -> Dict:
         """
@@ -57,41 +103,41 @@ class CoordinatorAgent:
                 'minority_opinions': List[Dict]
             }
         """
-        # Step 1: Run all domain agents
-        agent_outputs = []
-        
-        financial_output = self.financial_agent.evaluate(events)
-        agent_outputs.append(financial_output)
+        cache_key = self._analysis_cache_key(events, student_context)
+        now = time.monotonic()
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._analysis_cache.move_to_end(cache_key)
+                return entry[1]
         
-        academic_output = self.academic_agent.evaluate(events)
-        agent_outputs.append(academic_output)
+        result = self._analyze_uncached(events, student_context)
         
-        residential_output = self.residential_agent.evaluate(events)
-        agent_outputs.append(residential_output)
+        with self._analysis_cache_lock:
+            self._analysis_cache[cache_key] = (now + ANALYSIS_CACHE_TTL_SECONDS, result)
+            self._analysis_cache.move_to_end(cache_key)
+            while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
         
-        language_output = self.language_agent.evaluate(events)
-        agent_outputs.append(language_output)
-        
-        # Step 2: Run uncertainty agent with other outputs
-        uncertainty_output = self.uncertainty_agent.evaluate(events, agent_outputs)
-        agent_outputs.append(uncertainty_output)
-        
-        # Step 3: Run ethics agent (has veto power)
-        ethics_output = self.ethics_agent.evaluate(agent_outputs, student_context)
-        agent_outputs.append(ethics_output)
+        return result
+    
+    def _analysis_cache_key(self, events: List[StudentEvent], student_context: Dict = None):
+        """(student_id, events, context) - any new or changed event invalidates the entry"""
+        student_id = student_context.get('student_id') if student_context else None
+        if student_id is None and events:
+            student_id = events[0].student_id
+        # Full values rather than their hashes, so colliding inputs never share a result
+        events_key = tuple((e.id, e.event_type, e.severity, e.timestamp) for e in events)
+        context_key = repr(sorted(student_context.items())) if student_context else None
+        return (student_id, events_key, context_key)
+    
+    def _analyze_uncached(self, events: List[StudentEvent], student_context: Dict = None) -> Dict:
+        """Full multi-agent analysis behind the result cache"""
+        agent_outputs, uncertainty_output, ethics_output = self._run_agents(events, student_context)
         
         # Step 4: Check for ethics veto
         if ethics_output.get('veto', False):
-            return {
-                'decision': ethics_output['recommendation'],
-                'justification': ethics_output['comment'],
-                'aggregate_risk': ethics_output.get('risk', 0.0),
-                'uncertainty_level': uncertainty_output.get('risk', 0.0),
-                'ethics_veto': True,
-                'veto_reasons': ethics_output.get('veto_reasons', []),
-                'agent_outputs': agent_outputs,
-                'minority_opinions': self._identify_minority_opinions(agent_outputs)
-            }
+            return self._veto_result(agent_outputs, uncertainty_output, ethics_output)
         
         # Step 5: Calculate aggregate risk (weighted average)
         aggregate_risk = self._calculate_aggregate_risk(agent_outputs)
@@ -103,6 +149,96 @@ class CoordinatorAgent:
             agent_outputs
         )
         
+        return self._decision_result(decision, aggregate_risk, agent_outputs, uncertainty_output)
+    
+    def analyze_cohort(self, events_by_student: Dict[int, List[StudentEvent]], student_context: Dict = None) -> Dict[int, Dict]:
+        """
+        Analyze many students, scoring the whole cohort in one vectorized pass
+        
+        Agents still run per student (ethics review is never batched away), but
+        aggregation and decision thresholds operate on (N, num_agents) matrices.
+        
+        Returns:
+            dict: student_id -> same result shape as analyze_student
+        """
+        student_ids = list(events_by_student)
+        if not student_ids:
+            return {}
+        
+        runs = [self._run_agents(events_by_student[sid], student_context) for sid in student_ids]
+        
+        # SoA risk/confidence matrices; agents absent for a student get zero weight
+        column = {name: j for j, name in enumerate(AGGREGATE_WEIGHTS)}
+        weights = np.fromiter(AGGREGATE_WEIGHTS.values(), dtype=np.float64)
+        risk_matrix = np.zeros((len(runs), len(column)))
+        conf_matrix = np.zeros((len(runs), len(column)))
+        for i, (agent_outputs, _, _) in enumerate(runs):
+            for output in agent_outputs:
+                j = column.get(output['agent'])
+                if j is not None:
+                    risk_matrix[i, j] = output.get('risk', 0.0)
+                    conf_matrix[i, j] = output.get('confidence', 0.5)
+        
+        effective_weights = conf_matrix * weights
+        total_weights = effective_weights.sum(axis=1)
+        aggregate = np.divide(
+            (risk_matrix * effective_weights).sum(axis=1), total_weights,
+            out=np.zeros(len(runs)), where=total_weights != 0
+        )
+        
+        # Same thresholds as _make_decision, applied to the whole cohort
+        uncertainty = np.fromiter((u.get('risk', 0.0) for _, u, _ in runs), dtype=np.float64, count=len(runs))
+        decisions = np.where(
+            uncertainty > 0.7,
+            np.select([aggregate > 0.5, aggregate > 0.3], ["ESCALATE_TO_HUMAN", "WATCH"], "NO_ACTION"),
+            np.select([aggregate > 0.65, aggregate > 0.45, aggregate > 0.25],
+                      ["ESCALATE_TO_HUMAN", "SOFT_OUTREACH", "WATCH"], "NO_ACTION")
+        )
+        
+        results = {}
+        for i, sid in enumerate(student_ids):
+            agent_outputs, uncertainty_output, ethics_output = runs[i]
+            if ethics_output.get('veto', False):
+                results[sid] = self._veto_result(agent_outputs, uncertainty_output, ethics_output)
+            else:
+                results[sid] = self._decision_result(
+                    str(decisions[i]), float(aggregate[i]), agent_outputs, uncertainty_output
+                )
+        return results
+    
+    def _run_agents(self, events: List[StudentEvent], student_context: Dict = None):
+        """Run domain, uncertainty and ethics agents; returns (agent_outputs, uncertainty_output, ethics_output)"""
+        # Columnar view of the events, built once and shared by every agent
+        batch = EventBatch.from_events(events)
+        
+        # Step 1: Run all domain agents concurrently (output order is preserved)
+        agent_outputs = list(self._executor.map(lambda agent: agent.evaluate(events, batch), self.domain_agents))
+        
+        # Step 2: Run uncertainty agent with other outputs
+        uncertainty_output = self.uncertainty_agent.evaluate(events, agent_outputs, batch)
+        agent_outputs.append(uncertainty_output)
+        
+        # Step 3: Run ethics agent (has veto power)
+        ethics_output = self.ethics_agent.evaluate(agent_outputs, student_context)
+        agent_outputs.append(ethics_output)
+        
+        return agent_outputs, uncertainty_output, ethics_output
+    
+    def _veto_result(self, agent_outputs: List[Dict], uncertainty_output: Dict, ethics_output: Dict) -> Dict:
+        """Result when the ethics agent vetoes automation"""
+        return {
+            'decision': ethics_output['recommendation'],
+            'justification': ethics_output['comment'],
+            'aggregate_risk': ethics_output.get('risk', 0.0),
+            'uncertainty_level': uncertainty_output.get('risk', 0.0),
+            'ethics_veto': True,
+            'veto_reasons': ethics_output.get('veto_reasons', []),
+            'agent_outputs': agent_outputs,
+            'minority_opinions': self._identify_minority_opinions(agent_outputs)
+        }
+    
+    def _decision_result(self, decision: str, aggregate_risk: float, agent_outputs: List[Dict], uncertainty_output: Dict) -> Dict:
+        """Result for a coordinator decision"""
         justification = self._generate_justification(decision, aggregate_risk, agent_outputs)
         
         return {
@@ -121,32 +257,24 @@ class CoordinatorAgent:
         Calculate weighted aggregate risk from domain agents
         Excludes uncertainty and ethics agents
         """
-        weights = {
-            'FinancialAgent': 0.25,
-            'AcademicAgent': 0.20,
-            'ResidentialAgent': 0.20,
-            'LanguageAgent': 0.15,
-            'UncertaintyAgent': 0.20  # Uncertainty as a risk factor
-        }
+        weighted_outputs = [o for o in agent_outputs if o['agent'] in AGGREGATE_WEIGHTS]
+        if not weighted_outputs:
+            return 0.0
         
-        weighted_sum = 0.0
-        total_weight = 0.0
+        # Columnar view of the contributing agents
+        count = len(weighted_outputs)
+        risks = np.fromiter((o.get('risk', 0.0) for o in weighted_outputs), dtype=np.float64, count=count)
+        confidences = np.fromiter((o.get('confidence', 0.5) for o in weighted_outputs), dtype=np.float64, count=count)
+        assigned = np.fromiter((AGGREGATE_WEIGHTS[o['agent']] for o in weighted_outputs), dtype=np.float64, count=count)
         
-        for output in agent_outputs:
-            agent_name = output['agent']
-            if agent_name in weights:
-                risk = output.get('risk', 0.0)
-                confidence = output.get('confidence', 0.5)
-                
-                # Weight by both assigned weight and agent confidence
-                effective_weight = weights[agent_name] * confidence
-                weighted_sum += risk * effective_weight
-                total_weight += effective_weight
+        # Weight by both assigned weight and agent confidence
+        effective_weights = assigned * confidences
+        total_weight = effective_weights.sum()
         
         if total_weight == 0:
             return 0.0
         
-        return weighted_sum / total_weight
+        return float((risks * effective_weights).sum() / total_weight)
     
     def _make_decision(self, aggregate_risk: float, uncertainty: float, agent_outputs: List[Dict]) -> str:
         """
@@ -183,29 +311,19 @@ class CoordinatorAgent:
     def _generate_justification(self, decision: str, aggregate_risk: float, agent_outputs: List[Dict]) -> str:
         """Generate human-readable justification for decision"""
         # Identify contributing factors
-        high_risk_agents = [
-            o for o in agent_outputs 
+        names = ', '.join(
+            SHORT_NAMES.get(o['agent']) or o['agent'].replace('Agent', '')
+            for o in agent_outputs
             if o.get('risk', 0) > 0.5 and o['agent'] not in ['EthicsAgent', 'UncertaintyAgent']
-        ]
-        
-        if decision == "NO_ACTION":
-            return f"No intervention warranted (aggregate risk: {aggregate_risk:.2f})"
-        
-        elif decision == "WATCH":
-            if high_risk_agents:
-                agent_names = [a['agent'].replace('Agent', '') for a in high_risk_agents]
-                return f"Monitor situation - elevated {', '.join(agent_names)} friction (risk: {aggregate_risk:.2f})"
-            return f"Low-moderate friction detected (risk: {aggregate_risk:.2f}) - watchful waiting"
-        
-        elif decision == "SOFT_OUTREACH":
-            agent_names = [a['agent'].replace('Agent', '') for a in high_risk_agents]
-            return f"Suggest gentle check-in - notable {', '.join(agent_names)} barriers (risk: {aggregate_risk:.2f})"
+        )
         
-        elif decision == "ESCALATE_TO_HUMAN":
-            agent_names = [a['agent'].replace('Agent', '') for a in high_risk_agents]
-            return f"Human counselor recommended - significant {', '.join(agent_names)} friction (risk: {aggregate_risk:.2f})"
+        if decision == "WATCH" and not names:
+            return WATCH_QUIET_TEMPLATE(risk=aggregate_risk)
         
-        return f"Decision: {decision} (risk: {aggregate_risk:.2f})"
+        template = JUSTIFICATION_TEMPLATES.get(decision)
+        if template is None:
+            return f"Decision: {decision} (risk: {aggregate_risk:.2f})"
+        return template(names=names, risk=aggregate_risk)
     
     def _identify_minority_opinions(self, agent_outputs: List[Dict]) -> List[Dict]:
         """
@@ -220,18 +338,16 @@ class CoordinatorAgent:
         if len(domain_outputs) < 3:
             return []
         
-        risks = [o.get('risk', 0.0) for o in domain_outputs]
-        mean_risk = sum(risks) / len(risks)
-        
-        minority = []
-        for output in domain_outputs:
-            risk_diff = abs(output.get('risk', 0.0) - mean_risk)
-            if risk_diff > 0.3:  # Significantly different from mean
-                minority.append({
-                    'agent': output['agent'],
-                    'risk': output.get('risk', 0.0),
-                    'comment': output.get('comment', ''),
-                    'deviation': round(risk_diff, 3)
-                })
-        
-        return minority
\ No newline at end of file
+        risks = np.fromiter((o.get('risk', 0.0) for o in domain_outputs), dtype=np.float64, count=len(domain_outputs))
+        deviations = np.abs(risks - risks.mean())
+        
+        # Only agents significantly different from the mean are gathered
+        return [
+            {
+                'agent': domain_outputs[i]['agent'],
+                'risk': domain_outputs[i].get('risk', 0.0),
+                'comment': domain_outputs[i].get('comment', ''),
+                'deviation': round(float(deviations[i]), 3)
+            }
+            for i in np.flatnonzero(deviations > 0.3)
+        ]
\ No newline at end of file
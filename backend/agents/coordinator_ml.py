@@ -3,6 +3,10 @@ ML-Powered Coordinator Agent
 Orchestrates multi-agent system with ML models
 """
 
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from models import StudentEvent
 from agents.financial_agent_ml import FinancialAgentML
@@ -12,6 +16,27 @@ from agents.language_agent_ml import LanguageAgentML
 from utils.llm import get_llm
 
 
+# Result cache in front of evaluate; a student's events change over days, and
+# the TTL lets recency-dependent scores refresh
+EVALUATION_CACHE_SIZE = 10_000
+EVALUATION_CACHE_TTL_SECONDS = 300
+
+# Stable instruction block; only the per-student assessments follow it
+SYNTHESIS_PREFIX = """You synthesize risk assessments from four bureaucratic-friction agents
+(Financial, Academic, Residential, Language) in a student support system.
+
+Guidelines:
+- Describe institutional barriers, never the student's character or ability.
+- Name the domains driving the overall risk and whether they compound each other.
+- Tie the recommended action to the decision given (NO_ACTION, WATCH, SOFT_OUTREACH, ESCALATE_TO_HUMAN).
+- Do not invent events or numbers that are not listed.
+
+Provide a 2-3 sentence synthesis explaining the overall situation and recommended action.
+
+Agent assessments:
+"""
+
+
 class CoordinatorAgentML:
     """
     Coordinator that uses ML-powered agents for risk assessment.
@@ -26,9 +51,29 @@ class CoordinatorAgentML:
         self.residential_agent = ResidentialAgentML()
         self.language_agent = LanguageAgentML()
         
+        # Agents are I/O-bound on RAG/LLM round trips, so they run side by side
+        self.agents = [
+            self.financial_agent,
+            self.academic_agent,
+            self.residential_agent,
+            self.language_agent
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.agents))
+        
+        # event_type -> index into self.agents (domains are disjoint)
+        self.domain_of = {
+            event_type: i
+            for i, agent in enumerate(self.agents)
+            for event_type in agent.DOMAIN_TYPES
+        }
+        
         # LLM for synthesis
         self.llm = get_llm()
         
+        # LRU of ((id, event_type, severity, timestamp), ...) -> (expires_at, result)
+        self._evaluation_cache = OrderedDict()
+        self._evaluation_cache_lock = threading.Lock()
+        
         # Decision thresholds
         self.threshold_escalate = 0.7
         self.threshold_soft = 0.5
@@ -53,20 +98,38 @@ class CoordinatorAgentML:
                 'agent_outputs': []
             }
         
-        # Run all agents
-        agent_outputs = []
-        
-        financial_result = self.financial_agent.evaluate(events)
-        agent_outputs.append(financial_result)
+        cache_key = tuple((e.id, e.event_type, e.severity, e.timestamp) for e in events)
+        now = time.monotonic()
+        with self._evaluation_cache_lock:
+            entry = self._evaluation_cache.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._evaluation_cache.move_to_end(cache_key)
+                return entry[1]
         
-        academic_result = self.academic_agent.evaluate(events)
-        agent_outputs.append(academic_result)
+        result = self._evaluate_uncached(events)
         
-        residential_result = self.residential_agent.evaluate(events)
-        agent_outputs.append(residential_result)
+        with self._evaluation_cache_lock:
+            self._evaluation_cache[cache_key] = (now + EVALUATION_CACHE_TTL_SECONDS, result)
+            self._evaluation_cache.move_to_end(cache_key)
+            while len(self._evaluation_cache) > EVALUATION_CACHE_SIZE:
+                self._evaluation_cache.popitem(last=False)
         
-        language_result = self.language_agent.evaluate(events)
-        agent_outputs.append(language_result)
+        return result
+    
+    def _evaluate_uncached(self, events: List[StudentEvent]) -> Dict:
+        """All four ML agents + LLM synthesis behind the result cache."""
+        # Route events to their domain once, then run all agents concurrently
+        # on their own bucket (results keep agent order)
+        buckets = self._bucket_events(events)
+        agent_outputs = list(self._executor.map(
+            lambda agent, domain_events: agent.evaluate(domain_events, explain=False), self.agents, buckets
+        ))
+        
+        # One LLM call explains all four agents; splice the comments back in
+        llm_requests = [output.pop('llm_request') for output in agent_outputs]
+        for output, comment in zip(agent_outputs, self.llm.explain_risks_batch(llm_requests)):
+            output['comment'] = comment
+        financial_result, academic_result, residential_result, language_result = agent_outputs
         
         # Weighted risk aggregation
         total_weight = (
@@ -101,17 +164,14 @@ class CoordinatorAgentML:
             posture = 'OBSERVE'
         
         # Generate synthesis using LLM
-        synthesis_prompt = f"""Synthesize the following agent assessments:
-
-Financial: Risk={financial_result['risk']:.2f}, {financial_result['comment'][:100]}
+        # Static instructions first so the prompt prefix is byte-identical across students
+        synthesis_prompt = SYNTHESIS_PREFIX + f"""Financial: Risk={financial_result['risk']:.2f}, {financial_result['comment'][:100]}
 Academic: Risk={academic_result['risk']:.2f}, {academic_result['comment'][:100]}
 Residential: Risk={residential_result['risk']:.2f}, {residential_result['comment'][:100]}
 Language: Risk={language_result['risk']:.2f}, {language_result['comment'][:100]}
 
 Overall Risk: {weighted_risk:.2f}
-Decision: {decision}
-
-Provide a 2-3 sentence synthesis explaining the overall situation and recommended action."""
+Decision: {decision}"""
 
         justification = self.llm.generate(synthesis_prompt, max_new_tokens=100, temperature=0.5)
         
@@ -145,6 +205,16 @@ Provide a 2-3 sentence synthesis explaining the overall situation and recommende
             }
         }
     
+    def _bucket_events(self, events: List[StudentEvent]) -> List[List[StudentEvent]]:
+        """Split events into one list per agent in a single pass (unknown types are dropped)."""
+        buckets = [[] for _ in self.agents]
+        domain_of = self.domain_of
+        for e in events:
+            i = domain_of.get(e.event_type)
+            if i is not None:
+                buckets[i].append(e)
+        return buckets
+    
     def train_all_agents(self, training_data: List[Dict]):
         """
         Train all ML agents.
@@ -153,47 +223,27 @@ Provide a 2-3 sentence synthesis explaining the overall situation and recommende
             training_data: List of dicts with 'events' and 'label' keys
         """
         import numpy as np
-        from agents.features import extract_domain_features
+        from datetime import datetime
+        from agents.features import extract_features
         
-        # Prepare training data for each agent
-        financial_X, financial_y = [], []
-        academic_X, academic_y = [], []
-        residential_X, residential_y = [], []
-        language_X, language_y = [], []
+        # Preallocate one feature matrix per agent; labels are shared by all agents
+        n_samples = len(training_data)
+        X = np.empty((len(self.agents), n_samples, 6))
+        y = np.empty(n_samples, dtype=np.int8)
         
-        for sample in training_data:
-            events = sample['events']
-            label = 1 if sample['label'] else 0
-            
-            # Extract features for each domain
-            financial_features = extract_domain_features(events, self.financial_agent.domain_types)
-            academic_features = extract_domain_features(events, self.academic_agent.domain_types)
-            residential_features = extract_domain_features(events, self.residential_agent.domain_types)
-            language_features = extract_domain_features(events, self.language_agent.domain_types)
-            
-            financial_X.append(financial_features)
-            financial_y.append(label)
-            
-            academic_X.append(academic_features)
-            academic_y.append(label)
-            
-            residential_X.append(residential_features)
-            residential_y.append(label)
+        # One reference time for the whole training set
+        now = datetime.utcnow()
+        
+        for i, sample in enumerate(training_data):
+            y[i] = 1 if sample['label'] else 0
             
-            language_X.append(language_features)
-            language_y.append(label)
+            # Extract features for each domain from a single routing pass
+            for d, domain_events in enumerate(self._bucket_events(sample['events'])):
+                X[d, i] = extract_features(domain_events, now)
         
         # Train each agent
-        self.financial_agent.train(np.array(financial_X), np.array(financial_y))
-        self.financial_agent.save_model()
-        
-        self.academic_agent.train(np.array(academic_X), np.array(academic_y))
-        self.academic_agent.save_model()
-        
-        self.residential_agent.train(np.array(residential_X), np.array(residential_y))
-        self.residential_agent.save_model()
-        
-        self.language_agent.train(np.array(language_X), np.array(language_y))
-        self.language_agent.save_model()
+        for agent, agent_X in zip(self.agents, X):
+            agent.train(agent_X, y)
+            agent.save_model()
         
         print(f"{self.name}: All agents trained and saved")
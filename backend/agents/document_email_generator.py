@@ -1,5 +1,9 @@
 import os
+import re
 import json
+import atexit
+import httpx
+from functools import lru_cache
 from dotenv import load_dotenv
 from groq import Groq
 
@@ -14,9 +18,22 @@ if not GROQ_API_KEY:
     # Ideally should raise or use config
     print("WARNING: GROQ_API_KEY not found in env. Ensure it is set.")
 
-# Initialize Groq client safely
+
+
+def _make_http_client() -> httpx.Client:
+    """Pooled keep-alive transport so repeated calls skip the TLS handshake."""
+    limits = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+    try:
+        return httpx.Client(http2=True, limits=limits)
+    except ImportError:  # HTTP/2 needs the optional h2 package
+        return httpx.Client(limits=limits)
+
+
+# Initialize Groq client safely (one per process, reused by every request)
 try:
-    client = Groq(api_key=GROQ_API_KEY)
+    http_client = _make_http_client()
+    atexit.register(http_client.close)
+    client = Groq(api_key=GROQ_API_KEY, http_client=http_client)
 except Exception as e:
     print(f"Error initializing Groq client: {e}")
     client = None
@@ -39,48 +56,66 @@ def normalize(text: str) -> str:
     return text.lower().replace(" ", "").replace("_", "").replace("-", "")
 
 
+# College names normalized once at import (DEFAULT excluded), in file order
+NORMALIZED_GUIDELINES = tuple(
+    (normalize(name), policy)
+    for name, policy in COLLEGE_GUIDELINES.items()
+    if name != "DEFAULT"
+)
+
+
+@lru_cache(maxsize=1024)
 def get_college_policy(college: str):
-    """Find specific college policy or return default."""
+    """Find specific college policy or return default (memoized per college string)."""
     if not college:
         return COLLEGE_GUIDELINES.get("DEFAULT")
         
     normalized_college = normalize(college)
-    for name, policy in COLLEGE_GUIDELINES.items():
-        if name != "DEFAULT" and normalize(name) in normalized_college:
+    for name, policy in NORMALIZED_GUIDELINES:
+        if name in normalized_college:
             return policy
             
     return COLLEGE_GUIDELINES.get("DEFAULT")
 
 
+# Template keywords, checked in priority order (substring match, any case)
+TEMPLATE_PATTERNS = (
+    ("medical", re.compile("medical|doctor|hospital|sick|illness", re.I)),
+    ("internship", re.compile("internship|training|project|noc", re.I)),
+    ("attendance", re.compile("attendance|absent", re.I)),
+)
+
+
 def select_template(reason: str):
     """Select email template based on keywords in reason."""
     if not reason:
          return EMAIL_TEMPLATES["general"]
          
-    r = reason.lower()
-    if any(w in r for w in ["medical", "doctor", "hospital", "sick", "illness"]):
-        return EMAIL_TEMPLATES.get("medical", EMAIL_TEMPLATES["general"])
-    if any(w in r for w in ["internship", "training", "project", "noc"]):
-        return EMAIL_TEMPLATES.get("internship", EMAIL_TEMPLATES["general"])
-    if "attendance" in r or "absent" in r:
-        return EMAIL_TEMPLATES.get("attendance", EMAIL_TEMPLATES["general"])
+    for key, pattern in TEMPLATE_PATTERNS:
+        if pattern.search(reason):
+            return EMAIL_TEMPLATES.get(key, EMAIL_TEMPLATES["general"])
         
     return EMAIL_TEMPLATES["general"]
 
 
-def build_prompt(template, policy, tone, context, reason):
-    """Construct the LLM prompt."""
-    body_base = template.get("body", "")
-    body = body_base.replace("{{CONTEXT}}", context).replace("{{REASON}}", reason)
-
-    return f"""
+# Static instructions live in the system message so the request prefix is
+# byte-identical across calls (provider prompt caching); details go last.
+SYSTEM_PROMPT = """You are a precise email assistant. You return ONLY the email body text.
 You are an academic administrative email writer.
 
-Task: Write ONLY the body of an email. 
+Task: Write ONLY the body of an email.
 DO NOT include a Subject line.
 DO NOT include a closing or sign-off (like "Sincerely" or "[Your Name]").
 
-Details:
+Reference the listed college policies only when they are relevant to the request."""
+
+
+def build_prompt(template, policy, tone, context, reason):
+    """Construct the dynamic (per-request) part of the LLM prompt."""
+    body_base = template.get("body", "")
+    body = body_base.replace("{{CONTEXT}}", context).replace("{{REASON}}", reason)
+
+    return f"""Details:
 Tone: {tone}
 Context: {context}
 
@@ -115,7 +150,7 @@ def generate_email(
         response = client.chat.completions.create(
             model=MODEL_NAME,
             messages=[
-                {"role": "system", "content": "You are a precise email assistant. You return ONLY the email body text."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             max_tokens=400,
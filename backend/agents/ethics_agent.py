@@ -5,12 +5,12 @@ Now powered by LLM reasoning to detect subtlety.
 """
 
 from typing import List, Dict
-from llm_core import LLMService
+from llm_core import get_service
 
 class EthicsAgent:
     def __init__(self):
         self.name = "EthicsAgent"
-        self.llm = LLMService()
+        self.llm = get_service()
         self.role_description = "You are the ETHICAL GUARDIAN. You have VETO POWER. You block any automated action that threatens dignity, privacy, or safety."
         self.has_veto_power = True
 
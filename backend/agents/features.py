@@ -4,12 +4,100 @@ Extracts numerical features from student events for ML models
 """
 
 import numpy as np
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict, Any
-from models import StudentEvent
+from models import StudentEvent, EVENT_TYPE_CODES, EVENT_TYPE_NAMES
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; callers use NumPy reductions instead
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
 
-def extract_features(events: List[StudentEvent]) -> np.ndarray:
+DAY_NS = 86_400_000_000_000
+
+
+class EventBatch:
+    """
+    Column-oriented (SoA) view of a list of events.
+    
+    Materializes event_type codes, severities and timestamps once so
+    downstream computations are NumPy expressions instead of per-event
+    attribute lookups.
+    """
+    
+    def __init__(self, event_type: np.ndarray, severity: np.ndarray, timestamp_ns: np.ndarray):
+        self.event_type = event_type
+        self.severity = severity
+        self.timestamp_ns = timestamp_ns
+    
+    @classmethod
+    def from_events(cls, events: List[StudentEvent]) -> "EventBatch":
+        """Build the columns from StudentEvent objects in one pass each."""
+        count = len(events)
+        return cls(
+            event_type=event_type_codes(events),
+            severity=np.fromiter((e.severity for e in events), dtype=np.float64, count=count),
+            timestamp_ns=np.fromiter(
+                (int(e.timestamp.timestamp() * 1_000_000) * 1000 for e in events),
+                dtype=np.int64,
+                count=count
+            )
+        )
+    
+    def __len__(self) -> int:
+        return len(self.event_type)
+    
+    def select(self, domain_codes: np.ndarray) -> "EventBatch":
+        """Rows whose event-type code is in domain_codes."""
+        keep = np.isin(self.event_type, domain_codes)
+        return EventBatch(self.event_type[keep], self.severity[keep], self.timestamp_ns[keep])
+
+
+def event_type_codes(events: List[StudentEvent]) -> np.ndarray:
+    """
+    Integer event-type codes for a list of events.
+    
+    Uses the code stored at ingest, falling back to the shared map for
+    events that have not been flushed yet (or predate the column).
+    
+    Args:
+        events: List of StudentEvent objects
+        
+    Returns:
+        int8 NumPy array of shape (len(events),)
+    """
+    return np.fromiter(
+        (e.event_type_code if e.event_type_code is not None else EVENT_TYPE_CODES.get(e.event_type, 0)
+         for e in events),
+        dtype=np.int8,
+        count=len(events)
+    )
+
+
+def select_domain_events(events: List[StudentEvent], domain_codes: np.ndarray):
+    """
+    Select the events whose type code is in a domain.
+    
+    Args:
+        events: List of all student events
+        domain_codes: Integer codes of the domain's event types
+        
+    Returns:
+        Tuple of (domain events, their int8 codes)
+    """
+    codes = event_type_codes(events)
+    keep = np.isin(codes, domain_codes)
+    return [e for e, k in zip(events, keep) if k], codes[keep]
+
+
+def extract_features(events, now: datetime = None) -> np.ndarray:
     """
     Extract numerical features from student events.
     
@@ -22,68 +110,78 @@ def extract_features(events: List[StudentEvent]) -> np.ndarray:
     - max_days_since_event: Maximum days since any event
     
     Args:
-        events: List of StudentEvent objects
+        events: List of StudentEvent objects or an EventBatch
+        now: Reference time (defaults to utcnow); pass one value per request
         
     Returns:
         NumPy array of shape (6,) containing extracted features
     """
-    if not events:
+    if not len(events):
         # Return zero features if no events
         return np.zeros(6)
     
-    # Extract severity values
-    severities = [e.severity for e in events]
-    
-    # Calculate time-based features
-    now = datetime.utcnow()
-    days_since = [(now - e.timestamp).days for e in events]
-    
-    # Feature 1: Event count
-    event_count = len(events)
-    
-    # Feature 2: Average severity
-    avg_severity = np.mean(severities)
-    
-    # Feature 3: Maximum severity
-    max_severity = np.max(severities)
+    batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+    event_count = len(batch)
+    severities = batch.severity
     
-    # Feature 4: Severity standard deviation
-    severity_std = np.std(severities) if len(severities) > 1 else 0.0
+    # Whole days since each event (matches timedelta.days)
+    days_since = _days_since(batch.timestamp_ns, now)
     
-    # Feature 5: Average days since event
-    avg_days_since = np.mean(days_since)
-    
-    # Feature 6: Maximum days since event
-    max_days_since = np.max(days_since)
-    
-    features = np.array([
+    return np.array([
         event_count,
-        avg_severity,
-        max_severity,
-        severity_std,
-        avg_days_since,
-        max_days_since
+        severities.mean(),
+        severities.max(),
+        severities.std() if event_count > 1 else 0.0,
+        days_since.mean(),
+        days_since.max()
     ])
-    
-    return features
 
 
-def extract_domain_features(events: List[StudentEvent], domain_types: List[str]) -> np.ndarray:
+def _days_since(timestamp_ns: np.ndarray, now: datetime = None) -> np.ndarray:
+    """Whole days between each timestamp and now (floor, like timedelta.days)."""
+    if now is None:
+        now = datetime.utcnow()
+    now_ns = int(now.timestamp() * 1_000_000) * 1000
+    return (now_ns - timestamp_ns) // DAY_NS
+
+
+@njit("int64(int64[::1], int64)", cache=True)
+def _cluster_count(ts_sorted_ns, limit_ns):
+    """Number of consecutive gaps shorter than limit_ns in a sorted timestamp array."""
+    count = 0
+    for i in range(len(ts_sorted_ns) - 1):
+        if ts_sorted_ns[i + 1] - ts_sorted_ns[i] < limit_ns:
+            count += 1
+    return count
+
+
+@njit("int64(int64[::1], int64)", cache=True)
+def _count_after(timestamp_ns, cutoff_ns):
+    """Number of timestamps strictly after cutoff_ns."""
+    count = 0
+    for i in range(len(timestamp_ns)):
+        if timestamp_ns[i] > cutoff_ns:
+            count += 1
+    return count
+
+
+def _now_ns() -> int:
+    return int(datetime.utcnow().timestamp() * 1_000_000) * 1000
+
+
+def count_event_types(codes: np.ndarray) -> Dict[str, int]:
     """
-    Extract features for a specific domain (e.g., financial, academic).
+    Count event types from their integer codes.
     
     Args:
-        events: List of all student events
-        domain_types: List of event types relevant to this domain
+        codes: Event-type codes (see EVENT_TYPE_CODES)
         
     Returns:
-        NumPy array of domain-specific features
+        Dictionary mapping event types to counts, in order of first appearance
     """
-    # Filter events by domain
-    domain_events = [e for e in events if e.event_type in domain_types]
-    
-    # Extract features from domain-specific events
-    return extract_features(domain_events)
+    unique, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.argsort(first_seen)
+    return {EVENT_TYPE_NAMES.get(int(c), 'unknown'): int(n) for c, n in zip(unique[order], counts[order])}
 
 
 def get_event_type_distribution(events: List[StudentEvent]) -> Dict[str, int]:
@@ -96,20 +194,15 @@ def get_event_type_distribution(events: List[StudentEvent]) -> Dict[str, int]:
     Returns:
         Dictionary mapping event types to counts
     """
-    distribution = {}
-    for event in events:
-        event_type = event.event_type
-        distribution[event_type] = distribution.get(event_type, 0) + 1
-    
-    return distribution
+    return dict(Counter(e.event_type for e in events))
 
 
-def calculate_event_velocity(events: List[StudentEvent], window_days: int = 30) -> float:
+def calculate_event_velocity(events, window_days: int = 30) -> float:
     """
     Calculate the velocity of events (events per day) in recent window.
     
     Args:
-        events: List of StudentEvent objects
+        events: List of StudentEvent objects or an EventBatch
         window_days: Number of days to look back
         
     Returns:
@@ -118,24 +211,23 @@ def calculate_event_velocity(events: List[StudentEvent], window_days: int = 30)
     if not events:
         return 0.0
     
-    now = datetime.utcnow()
-    recent_events = [
-        e for e in events 
-        if (now - e.timestamp).days <= window_days
-    ]
-    
-    if not recent_events:
-        return 0.0
+    batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+    # (now - ts).days <= window_days  <=>  ts > now - (window_days + 1) days
+    cutoff_ns = _now_ns() - (window_days + 1) * DAY_NS
+    if HAVE_NUMBA:
+        recent_count = _count_after(np.ascontiguousarray(batch.timestamp_ns), cutoff_ns)
+    else:
+        recent_count = int(np.count_nonzero(batch.timestamp_ns > cutoff_ns))
     
-    return len(recent_events) / window_days
+    return recent_count / window_days
 
 
-def detect_event_clustering(events: List[StudentEvent], cluster_window_days: int = 14) -> int:
+def detect_event_clustering(events, cluster_window_days: int = 14) -> int:
     """
     Detect if events are clustered in time (indicates compounding issues).
     
     Args:
-        events: List of StudentEvent objects
+        events: List of StudentEvent objects or an EventBatch
         cluster_window_days: Window to consider events as clustered
         
     Returns:
@@ -144,13 +236,11 @@ def detect_event_clustering(events: List[StudentEvent], cluster_window_days: int
     if len(events) < 2:
         return 0
     
-    # Sort events by timestamp
-    sorted_events = sorted(events, key=lambda x: x.timestamp)
-    
-    clusters = 0
-    for i in range(len(sorted_events) - 1):
-        time_diff = (sorted_events[i + 1].timestamp - sorted_events[i].timestamp).days
-        if time_diff <= cluster_window_days:
-            clusters += 1
+    batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
     
-    return clusters
+    # gap.days <= cluster_window_days  <=>  gap < (cluster_window_days + 1) days
+    limit_ns = (cluster_window_days + 1) * DAY_NS
+    ts_sorted = np.sort(batch.timestamp_ns)
+    if HAVE_NUMBA:
+        return int(_cluster_count(ts_sorted, limit_ns))
+    return int(np.count_nonzero(np.diff(ts_sorted) < limit_ns))
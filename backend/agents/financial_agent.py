@@ -4,8 +4,14 @@ Detects cumulative bureaucratic barriers related to scholarships, fees, and fina
 NOT about poverty - about institutional friction
 """
 
+import numpy as np
+from datetime import datetime
 from typing import List, Dict
-from models import StudentEvent
+from models import StudentEvent, EVENT_TYPE_CODES, EVENT_TYPE_NAMES
+from agents.features import EventBatch, DAY_NS
+
+FINANCIAL_TYPES = ('scholarship_delay', 'fee_payment', 'financial_aid', 'account_hold')
+FINANCIAL_CODES = np.array([EVENT_TYPE_CODES[t] for t in FINANCIAL_TYPES], dtype=np.int8)
 
 
 class FinancialAgent:
@@ -18,7 +24,7 @@ class FinancialAgent:
         self.name = "FinancialAgent"
         self.weight = 0.25  # Contribution to overall risk assessment
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], batch: EventBatch = None) -> Dict:
         """
         Evaluate financial friction events
         
@@ -31,12 +37,11 @@ class FinancialAgent:
                 'details': dict
             }
         """
-        financial_events = [
-            e for e in events 
-            if e.event_type in ['scholarship_delay', 'fee_payment', 'financial_aid', 'account_hold']
-        ]
+        if batch is None:
+            batch = EventBatch.from_events(events)
+        financial_events = batch.select(FINANCIAL_CODES)
         
-        if not financial_events:
+        if not len(financial_events):
             return {
                 'agent': self.name,
                 'risk': 0.0,
@@ -47,14 +52,14 @@ class FinancialAgent:
         
         # Calculate risk based on event frequency and recency
         event_count = len(financial_events)
-        recent_events = [e for e in financial_events if self._is_recent(e, days=30)]
+        recent_count = self._count_recent(financial_events, days=30)
         
         # Severity accumulation (bureaucratic friction compounds)
-        avg_severity = sum(e.severity for e in financial_events) / event_count
+        avg_severity = float(financial_events.severity.mean())
         
         # Risk calculation
         frequency_factor = min(event_count / 5.0, 1.0)  # Normalize to max 5 events
-        recency_factor = len(recent_events) / max(event_count, 1)
+        recency_factor = recent_count / max(event_count, 1)
         severity_factor = avg_severity
         
         risk = (frequency_factor * 0.4 + recency_factor * 0.3 + severity_factor * 0.3)
@@ -63,7 +68,7 @@ class FinancialAgent:
         confidence = min(0.6 + (event_count * 0.05), 0.95)
         
         # Generate contextual comment
-        comment = self._generate_comment(event_count, recent_events, risk)
+        comment = self._generate_comment(event_count, recent_count, risk)
         
         return {
             'agent': self.name,
@@ -72,34 +77,30 @@ class FinancialAgent:
             'comment': comment,
             'details': {
                 'event_count': event_count,
-                'recent_events': len(recent_events),
+                'recent_events': recent_count,
                 'avg_severity': round(avg_severity, 3),
                 'primary_issues': self._get_primary_issues(financial_events)
             }
         }
     
-    def _is_recent(self, event: StudentEvent, days: int = 30) -> bool:
-        """Check if event occurred within specified days"""
-        from datetime import datetime, timedelta
-        cutoff = datetime.utcnow() - timedelta(days=days)
-        return event.timestamp >= cutoff
+    def _count_recent(self, batch: EventBatch, days: int = 30) -> int:
+        """Count events that occurred within specified days"""
+        cutoff_ns = int(datetime.utcnow().timestamp() * 1_000_000) * 1000 - days * DAY_NS
+        return int(np.count_nonzero(batch.timestamp_ns >= cutoff_ns))
     
-    def _generate_comment(self, count: int, recent: List, risk: float) -> str:
+    def _generate_comment(self, count: int, recent_count: int, risk: float) -> str:
         """Generate human-readable comment about financial friction"""
         if risk < 0.3:
             return "Minimal financial friction detected"
         elif risk < 0.6:
-            return f"Moderate financial bureaucratic delays ({count} events, {len(recent)} recent)"
+            return f"Moderate financial bureaucratic delays ({count} events, {recent_count} recent)"
         else:
             return f"Significant financial friction pattern - {count} cumulative barriers detected"
     
-    def _get_primary_issues(self, events: List[StudentEvent]) -> List[str]:
+    def _get_primary_issues(self, batch: EventBatch) -> List[str]:
         """Identify most common financial friction types"""
-        issue_counts = {}
-        for event in events:
-            issue_type = event.event_type
-            issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+        codes, first_seen, counts = np.unique(batch.event_type, return_index=True, return_counts=True)
         
-        # Return top 3 issues
-        sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
-        return [issue[0] for issue in sorted_issues[:3]]
\ No newline at end of file
+        # Return top 3 issues (most frequent first, ties in order of appearance)
+        top = np.lexsort((first_seen, -counts))[:3]
+        return [EVENT_TYPE_NAMES[int(c)] for c in codes[top]]
\ No newline at end of file
@@ -4,35 +4,45 @@ Detects financial bureaucratic friction using machine learning
 """
 
 import numpy as np
+from datetime import datetime
 from typing import List, Dict
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
 
 from models import StudentEvent
-from agents.features import extract_domain_features
+from agents.features import EventBatch, extract_features, DAY_NS
+from agents.linear_risk import LinearRiskMixin, load_artifacts
 from utils.rag import DomainRAG
 from utils.llm import get_llm
 
 
-class FinancialAgentML:
+MODEL_PATH = 'models/financial_agent.pkl'
+SCALER_PATH = 'models/financial_scaler.pkl'
+
+
+# Pre-trained model/scaler, loaded once per process
+_MODEL, _SCALER = load_artifacts(MODEL_PATH, SCALER_PATH, "FinancialAgent")
+
+
+class FinancialAgentML(LinearRiskMixin):
     """
     Financial friction agent with ML model, RAG, and LLM reasoning.
     """
     
+    # Domain-specific event types (class constant: no per-instance allocation)
+    DOMAIN_TYPES = frozenset({
+        'scholarship_delay',
+        'fee_payment',
+        'financial_aid',
+        'account_hold'
+    })
+    
     def __init__(self):
         self.name = "FinancialAgent"
         self.weight = 0.25
         
-        # Domain-specific event types
-        self.domain_types = [
-            'scholarship_delay',
-            'fee_payment',
-            'financial_aid',
-            'account_hold'
-        ]
-        
         # ML Model
         self.model = LogisticRegression(random_state=42, max_iter=1000)
         self.scaler = StandardScaler()
@@ -48,20 +58,10 @@ class FinancialAgentML:
         self._load_model()
     
     def _load_model(self):
-        """Load pre-trained model if available."""
-        model_path = 'models/financial_agent.pkl'
-        scaler_path = 'models/financial_scaler.pkl'
-        
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
-            try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                self.model_trained = True
-                print(f"{self.name}: Loaded pre-trained model")
-            except Exception as e:
-                print(f"{self.name}: Could not load model: {e}")
+        """Attach the process-wide pre-trained model if available."""
+        if _MODEL is not None:
+            self._attach_model(_MODEL, _SCALER)
+            print(f"{self.name}: Loaded pre-trained model")
     
     def train(self, X: np.ndarray, y: np.ndarray):
         """
@@ -75,12 +75,7 @@ class FinancialAgentML:
             print(f"{self.name}: Insufficient data for training")
             return
         
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
-        
-        # Train model
-        self.model.fit(X_scaled, y)
-        self.model_trained = True
+        self._fit(X, y)
         
         print(f"{self.name}: Model trained on {len(X)} samples")
     
@@ -88,34 +83,35 @@ class FinancialAgentML:
         """Save trained model to disk."""
         os.makedirs('models', exist_ok=True)
         
-        with open('models/financial_agent.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
-        with open('models/financial_scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
+        joblib.dump(self.model, MODEL_PATH, compress=0)
+        joblib.dump(self.scaler, SCALER_PATH, compress=0)
         
         print(f"{self.name}: Model saved")
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], explain: bool = True) -> Dict:
         """
         Evaluate financial friction with ML + RAG + LLM.
         
         Args:
             events: List of all student events
+            explain: Generate the LLM comment now; when False the output carries
+                     an 'llm_request' for the caller to batch instead
             
         Returns:
             Dictionary with risk, confidence, and reasoning
         """
         # Filter domain-specific events
-        financial_events = [e for e in events if e.event_type in self.domain_types]
+        financial_events = [e for e in events if e.event_type in self.DOMAIN_TYPES]
         
-        # Extract features
-        features = extract_domain_features(events, self.domain_types)
+        # Extract features from one columnar view of the domain events
+        batch = EventBatch.from_events(financial_events)
+        features = extract_features(batch)
         
         # ML Prediction
         if self.model_trained and len(features) > 0:
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            risk_prob = self.model.predict_proba(features_scaled)[0][1]
-            ml_confidence = max(self.model.predict_proba(features_scaled)[0])
+            probs = self._predict_proba(features.reshape(1, -1))[0]
+            risk_prob = probs[1]
+            ml_confidence = probs.max()
         else:
             # Fallback to heuristic
             risk_prob = self._heuristic_risk(financial_events)
@@ -125,22 +121,27 @@ class FinancialAgentML:
         query = f"Financial events: {len(financial_events)} events with average severity {features[1]:.2f}"
         rag_context = self.rag.retrieve_context(query, top_k=2)
         
+        # Events less than 30 whole days old, counted in one comparison
+        cutoff_ns = int(datetime.utcnow().timestamp() * 1_000_000) * 1000 - 30 * DAY_NS
+        recent_count = int(np.count_nonzero(batch.timestamp_ns > cutoff_ns))
+        
         # LLM Reasoning
         feature_dict = {
             'event_count': int(features[0]),
             'avg_severity': float(features[1]),
             'max_severity': float(features[2]),
-            'recent_events': len([e for e in financial_events if (np.datetime64('now') - np.datetime64(e.timestamp)).astype('timedelta64[D]').astype(int) < 30])
+            'recent_events': recent_count
         }
         
-        llm_explanation = self.llm.explain_risk(
-            self.name,
-            risk_prob,
-            feature_dict,
-            context=f"RAG Context:\n{rag_context}"
-        )
+        llm_request = {
+            'agent_name': self.name,
+            'risk_score': risk_prob,
+            'features': feature_dict,
+            'context': f"RAG Context:\n{rag_context}"
+        }
+        llm_explanation = self.llm.explain_risk(**llm_request) if explain else None
         
-        return {
+        output = {
             'agent': self.name,
             'risk': round(float(risk_prob), 3),
             'confidence': round(float(ml_confidence), 3),
@@ -153,6 +154,9 @@ class FinancialAgentML:
                 'rag_context_used': True
             }
         }
+        if not explain:
+            output['llm_request'] = llm_request
+        return output
     
     def _heuristic_risk(self, events: List[StudentEvent]) -> float:
         """Fallback heuristic risk calculation."""
@@ -6,17 +6,17 @@ Focuses on "How long has this been stuck?" and "How many issues are piling up?"
 
 from typing import List, Dict
 from models import StudentEvent
-from llm_core import LLMService
+from llm_core import get_service, format_event_log
 
 class FrictionAccumulationAgent:
     def __init__(self):
         self.name = "FrictionAccumulationAgent"
-        self.llm = LLMService()
+        self.llm = get_service()
         self.role_description = "You track the accumulation of bureaucratic friction. You care about DURATION (how long pending) and STACKING (how many simultaneous issues)."
 
     def evaluate(self, events: List[StudentEvent]) -> Dict:
         # Convert events to simple readable format for LLM
-        event_log = "\n".join([f"- [{e.timestamp}] {e.event_type}: {e.description} (Severity: {e.severity})" for e in events])
+        event_log = format_event_log(events, include_severity=True)
         
         prompt = f"""
         Analyze these student events for FRICTION ACCUMULATION.
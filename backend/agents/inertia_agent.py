@@ -6,18 +6,19 @@ Asks: "Even if we act today, will it matter in time?"
 
 from typing import List, Dict
 from models import StudentEvent
-from llm_core import LLMService
+from llm_core import get_service, format_event_log
 
 class InstitutionalInertiaAgent:
     def __init__(self):
         self.name = "InstitutionalInertiaAgent"
-        self.llm = LLMService()
+        self.llm = get_service()
         self.role_description = "You are the cynic. You know the bureaucracy is slow. You measure SYSTEM LATENCY and BACKLOG."
 
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def build_prompt(self, events: List[StudentEvent], event_log: str = None) -> str:
         # In a real app, this agent would check Admin Queues/Backlogs.
         # Here, we infer inertia from the history of delays in the events.
-        event_log = "\n".join([f"- [{e.timestamp}] {e.event_type}: {e.description}" for e in events])
+        if event_log is None:
+            event_log = format_event_log(events)
         
         prompt = f"""
         Analyze the SYSTEM INERTIA (Slowness) demonstrated in these events.
@@ -32,5 +33,8 @@ class InstitutionalInertiaAgent:
         
         Return JSON details: inertia_score (0=fast, 1=frozen), confidence, reasoning, estimated_resolution_days.
         """
-        
+        return prompt
+
+    def evaluate(self, events: List[StudentEvent], event_log: str = None) -> Dict:
+        prompt = self.build_prompt(events, event_log)
         return self.llm.query_agent(self.name, prompt, {"role_description": self.role_description})
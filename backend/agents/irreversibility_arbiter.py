@@ -6,71 +6,173 @@ Synthesizes the Agent Debate and calculates:
 2. Final Posture (Observe, Soft Outreach, Urgent Human Escalation)
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from models import StudentEvent
-from agents.friction_agent import FrictionAccumulationAgent
 from agents.recovery_agent import RecoveryCapacityAgent
 from agents.inertia_agent import InstitutionalInertiaAgent
-from agents.ethics_agent import EthicsAgent
-from llm_core import LLMService
+from agents.meta_analyst_agent import MetaAnalystAgent
+from llm_core import get_service, format_event_log
+
+# Shared across arbiter instances (main.py builds one per request); the
+# sub-agent calls are I/O-bound, so threads overlap their LLM round-trips
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Cheap path: when the debate is one-sided the synthesis LLM call is skipped
+CALM_RISK_THRESHOLD = 0.1  # every domain risk below this -> OBSERVE
+SPARSE_CALM_RISK_THRESHOLD = 0.2  # ...or below this with too few events to say more
+SPARSE_EVENT_COUNT = 3  # UncertaintyAgent's SPARSE_DATA cut-off
+CALM_SYNTHESIS = {
+    'posture': "OBSERVE",
+    'distance_to_irreversibility': 90,
+    'headline': "No Significant Friction Detected",
+    'synthesis': "All agents report low friction, ample recovery capacity and a responsive system. Continue passive observation."
+}
 
 class IrreversibilityArbiter:
     def __init__(self):
         self.name = "IrreversibilityArbiter"
-        self.llm = LLMService()
+        self.llm = get_service()
         self.role_description = "You are the FINAL DECISION MAKER. You synthesize the debate between agents. Your goal is to estimate the POINT OF NO RETURN."
         
-        # Initialize sub-agents
-        self.friction_agent = FrictionAccumulationAgent()
+        # Initialize sub-agents (friction + ethics share one LLM call)
         self.recovery_agent = RecoveryCapacityAgent()
         self.inertia_agent = InstitutionalInertiaAgent()
-        self.ethics_agent = EthicsAgent()
+        self.meta_analyst = MetaAnalystAgent()
 
     def analyze_student(self, events: List[StudentEvent], student_context: Dict = None) -> Dict:
         """
         Orchestrate the multi-agent debate and synthesize the result.
         """
-        agent_outputs = []
+        # 1. Run Domain Agents concurrently (independent LLM calls) over one shared event log
+        event_log = format_event_log(events)
+        recovery_future = _EXECUTOR.submit(self.recovery_agent.evaluate, events, event_log)
+        inertia_future = _EXECUTOR.submit(self.inertia_agent.evaluate, events, event_log)
         
-        # 1. Run Domain Agents
-        friction_output = self.friction_agent.evaluate(events)
-        friction_output['agent'] = self.friction_agent.name # Ensure name involved
-        agent_outputs.append(friction_output)
-        
-        recovery_output = self.recovery_agent.evaluate(events)
+        recovery_output = recovery_future.result()
         recovery_output['agent'] = self.recovery_agent.name
-        agent_outputs.append(recovery_output)
         
-        inertia_output = self.inertia_agent.evaluate(events)
+        inertia_output = inertia_future.result()
         inertia_output['agent'] = self.inertia_agent.name
-        agent_outputs.append(inertia_output)
         
-        # 2. Run Ethics Agent (Reviewing the others)
-        ethics_output = self.ethics_agent.evaluate(agent_outputs, student_context)
-        ethics_output['agent'] = self.ethics_agent.name
-        agent_outputs.append(ethics_output)
+        # 2. Friction analysis + Ethics review (of the others) in one LLM call
+        friction_output, ethics_output = self.meta_analyst.evaluate(
+            events, [recovery_output, inertia_output], student_context
+        )
+        agent_outputs = [friction_output, recovery_output, inertia_output, ethics_output]
         
         # 3. IF Ethics VETO -> Return Veto Result
         if ethics_output.get('veto', False):
-             return {
-                'decision': ethics_output['recommendation'],
-                'justification': f"ETHICS VETO: {ethics_output.get('ethical_assessment', 'Blocked by ethics agent')}",
-                'aggregate_risk': 1.0, # Treat as high priority
-                'uncertainty_level': 0.0,
-                'ethics_veto': True,
-                'veto_reasons': ethics_output.get('veto_reasons', []),
-                'agent_outputs': agent_outputs,
-                'distance_to_irreversibility': 0, # Imminent
-                'headline': "Blocked by Ethics Guardian"
-            }
+            return self._veto_result(ethics_output, agent_outputs)
             
-        # 4. Synthesize Debate via LLM
-        debate_transcript = "\n---\n".join([
-            f"Agent {o.get('agent')}: {o.get('reasoning') or o.get('comment') or 'No details'}"
-            for o in agent_outputs
+        # 4. Synthesize Debate via LLM (unless the outcome is already determined)
+        arbiter_result = self._deterministic_synthesis(agent_outputs, len(events))
+        if arbiter_result is None:
+            arbiter_result = self.llm.query_agent(
+                self.name, self._synthesis_prompt(agent_outputs), {"role_description": self.role_description}
+            )
+        
+        # 5. Format for the API/Frontend
+        return self._final_result(arbiter_result, agent_outputs)
+
+    def analyze_students(self, events_by_student: Dict[int, List[StudentEvent]]) -> Dict[int, Dict]:
+        """
+        Analyze many students with one batched LLM dispatch per debate phase
+        (domain agents, friction+ethics, synthesis) instead of per student.
+        """
+        student_ids = list(events_by_student)
+        recovery_context = {"role_description": self.recovery_agent.role_description}
+        inertia_context = {"role_description": self.inertia_agent.role_description}
+        meta_context = {"role_description": self.meta_analyst.role_description}
+        arbiter_context = {"role_description": self.role_description}
+        
+        # Phase 1: recovery + inertia for every student
+        requests = []
+        for sid in student_ids:
+            events = events_by_student[sid]
+            event_log = format_event_log(events)
+            requests.append((self.recovery_agent.name, self.recovery_agent.build_prompt(events, event_log), recovery_context))
+            requests.append((self.inertia_agent.name, self.inertia_agent.build_prompt(events, event_log), inertia_context))
+        responses = self.llm.query_agents_batch(requests)
+        
+        domain_outputs = {}
+        for i, sid in enumerate(student_ids):
+            recovery_output, inertia_output = responses[2 * i], responses[2 * i + 1]
+            recovery_output['agent'] = self.recovery_agent.name
+            inertia_output['agent'] = self.inertia_agent.name
+            domain_outputs[sid] = [recovery_output, inertia_output]
+        
+        # Phase 2: friction + ethics for every student
+        responses = self.llm.query_agents_batch([
+            (self.meta_analyst.name, self.meta_analyst.build_prompt(events_by_student[sid], domain_outputs[sid]), meta_context)
+            for sid in student_ids
         ])
         
-        prompt = f"""
+        results = {}
+        pending = []
+        for sid, response in zip(student_ids, responses):
+            friction_output, ethics_output = self.meta_analyst.split_result(response)
+            agent_outputs = [friction_output, *domain_outputs[sid], ethics_output]
+            if ethics_output.get('veto', False):
+                results[sid] = self._veto_result(ethics_output, agent_outputs)
+                continue
+            arbiter_result = self._deterministic_synthesis(agent_outputs, len(events_by_student[sid]))
+            if arbiter_result is not None:
+                results[sid] = self._final_result(arbiter_result, agent_outputs)
+            else:
+                pending.append((sid, agent_outputs))
+        
+        # Phase 3: synthesis for every student still ambiguous
+        responses = self.llm.query_agents_batch([
+            (self.name, self._synthesis_prompt(agent_outputs), arbiter_context)
+            for _, agent_outputs in pending
+        ])
+        for (sid, agent_outputs), arbiter_result in zip(pending, responses):
+            results[sid] = self._final_result(arbiter_result, agent_outputs)
+        
+        return {sid: results[sid] for sid in student_ids}
+
+    def _veto_result(self, ethics_output: Dict, agent_outputs: List[Dict]) -> Dict:
+        return {
+            'decision': ethics_output['recommendation'],
+            'justification': f"ETHICS VETO: {ethics_output.get('ethical_assessment', 'Blocked by ethics agent')}",
+            'aggregate_risk': 1.0, # Treat as high priority
+            'uncertainty_level': 0.0,
+            'ethics_veto': True,
+            'veto_reasons': ethics_output.get('veto_reasons', []),
+            'agent_outputs': agent_outputs,
+            'distance_to_irreversibility': 0, # Imminent
+            'headline': "Blocked by Ethics Guardian"
+        }
+
+    def _deterministic_synthesis(self, agent_outputs: List[Dict], event_count: int):
+        """Canned OBSERVE synthesis when every domain risk is low, else None (ask the LLM)."""
+        risks = []
+        for o in agent_outputs:
+            if 'risk' in o:
+                risks.append(o['risk'])
+            elif 'capacity_score' in o:
+                risks.append(1.0 - o['capacity_score'])
+            elif 'inertia_score' in o:
+                risks.append(o['inertia_score'])
+        if len(risks) < 3:
+            return None  # a domain agent failed; let the LLM weigh what is there
+        
+        highest = max(risks)
+        if highest < CALM_RISK_THRESHOLD or (
+            event_count < SPARSE_EVENT_COUNT and highest < SPARSE_CALM_RISK_THRESHOLD
+        ):
+            return dict(CALM_SYNTHESIS)
+        return None
+
+    def _synthesis_prompt(self, agent_outputs: List[Dict]) -> str:
+        # Every output has its 'agent' key stamped by the time it reaches synthesis
+        debate_transcript = "\n---\n".join(
+            f"Agent {o['agent']}: {o.get('reasoning') or o.get('comment') or 'No details'}"
+            for o in agent_outputs
+        )
+        
+        return f"""
         Synthesize this Multi-Agent Debate for a student:
         
         {debate_transcript}
@@ -82,10 +184,8 @@ class IrreversibilityArbiter:
         
         Return JSON details: posture, distance_to_irreversibility (0-100), headline, synthesis.
         """
-        
-        arbiter_result = self.llm.query_agent(self.name, prompt, {"role_description": self.role_description})
-        
-        # 5. Format for the API/Frontend
+
+    def _final_result(self, arbiter_result: Dict, agent_outputs: List[Dict]) -> Dict:
         # Map new metrics to old schema where possible for compatibility, or extend schema
         return {
             'decision': arbiter_result.get('posture', "OBSERVE"),
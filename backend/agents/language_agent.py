@@ -4,8 +4,14 @@ Detects language mismatch and communication barriers
 Focus: institutional language vs. student's primary language
 """
 
+import numpy as np
 from typing import List, Dict
-from datetime import datetime, timedelta
+from models import EVENT_TYPE_CODES
+from agents.features import EventBatch, count_event_types
+
+LANGUAGE_CODES = np.array([EVENT_TYPE_CODES[t] for t in (
+    'language_barrier', 'communication_issue', 'form_confusion', 'instruction_misunderstanding'
+)], dtype=np.int8)
 
 
 class LanguageAgent:
@@ -18,7 +24,7 @@ class LanguageAgent:
         self.name = "LanguageAgent"
         self.weight = 0.15
     
-    def evaluate(self, events: List) -> Dict:
+    def evaluate(self, events: List, batch: EventBatch = None) -> Dict:
         """
         Evaluate language and communication friction
         
@@ -27,13 +33,19 @@ class LanguageAgent:
         - Misunderstood bureaucratic processes
         - Communication barriers with administration
         """
-        language_events = [
-            e for e in events 
-            if e.get('event_type') in ['language_barrier', 'communication_issue', 
-                                       'form_confusion', 'instruction_misunderstanding']
-        ]
+        # Columnar view (shared batch, or built from the event dicts), then one mask for the domain
+        if batch is not None:
+            codes, severities = batch.event_type, batch.severity
+        else:
+            total = len(events)
+            codes = np.fromiter(
+                (EVENT_TYPE_CODES.get(e.get('event_type'), 0) for e in events), dtype=np.int8, count=total
+            )
+            severities = np.fromiter((e.get('severity', 0.5) for e in events), dtype=np.float64, count=total)
+        mask = np.isin(codes, LANGUAGE_CODES)
+        language_codes = codes[mask]
         
-        if not language_events:
+        if not len(language_codes):
             return {
                 'agent': self.name,
                 'risk': 0.0,
@@ -42,13 +54,13 @@ class LanguageAgent:
                 'details': {'event_count': 0}
             }
         
-        event_count = len(language_events)
+        event_count = len(language_codes)
         
         # Language barriers often cascade - each makes the next worse
         cascade_factor = min(1.0 + (event_count - 1) * 0.2, 2.0)
         
         # Severity matters here - mild confusion vs. complete breakdown
-        avg_severity = sum(e.get('severity', 0.5) for e in language_events) / event_count
+        avg_severity = float(severities[mask].mean())
         
         # Base risk calculation
         base_risk = min(event_count / 5.0, 0.8)
@@ -68,7 +80,7 @@ class LanguageAgent:
                 'event_count': event_count,
                 'avg_severity': round(avg_severity, 3),
                 'cascade_factor': round(cascade_factor, 2),
-                'barrier_types': self._categorize_barriers(language_events)
+                'barrier_types': self._categorize_barriers(language_codes)
             }
         }
     
@@ -83,10 +95,6 @@ class LanguageAgent:
         else:
             return f"Severe language friction - {count} cascading communication barriers (severity: {severity:.2f})"
     
-    def _categorize_barriers(self, events: List) -> Dict[str, int]:
+    def _categorize_barriers(self, codes: np.ndarray) -> Dict[str, int]:
         """Categorize types of language barriers"""
-        categories = {}
-        for event in events:
-            event_type = event.get('event_type', 'unknown')
-            categories[event_type] = categories.get(event_type, 0) + 1
-        return categories
\ No newline at end of file
+        return count_event_types(codes)
\ No newline at end of file
@@ -4,34 +4,66 @@ Detects communication and language barriers using machine learning
 """
 
 import numpy as np
+from functools import lru_cache
 from typing import List, Dict
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
 
 from models import StudentEvent
-from agents.features import extract_domain_features
+from agents.features import extract_features
+from agents.linear_risk import LinearRiskMixin, load_artifacts
 from utils.rag import DomainRAG
 from utils.llm import get_llm
 
 
-class LanguageAgentML:
+MODEL_PATH = 'models/language_agent.pkl'
+SCALER_PATH = 'models/language_scaler.pkl'
+
+
+# Heuristic frequency factor min(n / 4, 1), saturating at 4 events
+FREQUENCY_FACTOR = tuple(min(n / 4.0, 1.0) for n in range(5))
+
+
+# Dev only: reload the artifacts when the files on disk change
+MODEL_HOT_RELOAD = os.getenv("MODEL_HOT_RELOAD") == "1"
+
+
+def _artifact_mtimes():
+    try:
+        return os.path.getmtime(MODEL_PATH), os.path.getmtime(SCALER_PATH)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _get_language_artifacts(version=None):
+    """
+    Load the pre-trained model/scaler once per process, memory-mapping numpy arrays.
+    
+    `version` is the files' mtimes under MODEL_HOT_RELOAD (a new version
+    evicts the old entry), otherwise None so the first load is kept.
+    """
+    return load_artifacts(MODEL_PATH, SCALER_PATH, "LanguageAgent")
+
+
+class LanguageAgentML(LinearRiskMixin):
     """
     Language friction agent with ML model, RAG, and LLM reasoning.
     """
     
+    # Domain-specific event types (class constant: no per-instance allocation)
+    DOMAIN_TYPES = frozenset({
+        'language_barrier',
+        'form_confusion',
+        'communication_issue'
+    })
+    
     def __init__(self):
         self.name = "LanguageAgent"
         self.weight = 0.15
         
-        # Domain-specific event types
-        self.domain_types = [
-            'language_barrier',
-            'form_confusion',
-            'communication_issue'
-        ]
-        
         # ML Model
         self.model = LogisticRegression(random_state=42, max_iter=1000)
         self.scaler = StandardScaler()
@@ -46,47 +78,34 @@ class LanguageAgentML:
         self._load_model()
     
     def _load_model(self):
-        """Load pre-trained model if available."""
-        model_path = 'models/language_agent.pkl'
-        scaler_path = 'models/language_scaler.pkl'
-        
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
-            try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                self.model_trained = True
-            except Exception as e:
-                pass
+        """Attach the process-wide pre-trained model if available."""
+        model, scaler = _get_language_artifacts(_artifact_mtimes() if MODEL_HOT_RELOAD else None)
+        if model is not None:
+            self._attach_model(model, scaler)
     
     def train(self, X: np.ndarray, y: np.ndarray):
         """Train the ML model."""
         if len(X) < 2:
             return
         
-        X_scaled = self.scaler.fit_transform(X)
-        self.model.fit(X_scaled, y)
-        self.model_trained = True
+        self._fit(X, y)
     
     def save_model(self):
         """Save trained model to disk."""
         os.makedirs('models', exist_ok=True)
-        with open('models/language_agent.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
-        with open('models/language_scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
+        joblib.dump(self.model, MODEL_PATH, compress=0)
+        joblib.dump(self.scaler, SCALER_PATH, compress=0)
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], explain: bool = True) -> Dict:
         """Evaluate language friction with ML + RAG + LLM."""
-        language_events = [e for e in events if e.event_type in self.domain_types]
-        features = extract_domain_features(events, self.domain_types)
+        language_events = [e for e in events if e.event_type in self.DOMAIN_TYPES]
+        features = extract_features(language_events)
         
         # ML Prediction
         if self.model_trained and len(features) > 0:
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            risk_prob = self.model.predict_proba(features_scaled)[0][1]
-            ml_confidence = max(self.model.predict_proba(features_scaled)[0])
+            probs = self._predict_proba(features[None, :])[0]
+            risk_prob = probs[1]
+            ml_confidence = probs.max()
         else:
             risk_prob = self._heuristic_risk(language_events)
             ml_confidence = 0.6
@@ -102,14 +121,15 @@ class LanguageAgentML:
             'max_severity': float(features[2])
         }
         
-        llm_explanation = self.llm.explain_risk(
-            self.name,
-            risk_prob,
-            feature_dict,
-            context=f"RAG Context:\n{rag_context}"
-        )
+        llm_request = {
+            'agent_name': self.name,
+            'risk_score': risk_prob,
+            'features': feature_dict,
+            'context': f"RAG Context:\n{rag_context}"
+        }
+        llm_explanation = self.llm.explain_risk(**llm_request) if explain else None
         
-        return {
+        output = {
             'agent': self.name,
             'risk': round(float(risk_prob), 3),
             'confidence': round(float(ml_confidence), 3),
@@ -120,6 +140,9 @@ class LanguageAgentML:
                 'max_severity': round(float(features[2]), 3)
             }
         }
+        if not explain:
+            output['llm_request'] = llm_request
+        return output
     
     def _heuristic_risk(self, events: List[StudentEvent]) -> float:
         """Fallback heuristic risk calculation."""
@@ -130,7 +153,7 @@ class LanguageAgentML:
         avg_severity = sum(e.severity for e in events) / event_count
         
         # Language barriers compound other issues
-        frequency_factor = min(event_count / 4.0, 1.0)
+        frequency_factor = FREQUENCY_FACTOR[min(event_count, 4)]
         severity_factor = avg_severity
         
         return (frequency_factor * 0.5 + severity_factor * 0.5)
@@ -0,0 +1,61 @@
+"""
+Linear Risk Model Helpers for the ML Agents
+Artifact loading, float32 inference and retraining shared by every domain agent
+"""
+
+import logging
+import os
+import numpy as np
+import joblib
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+log = logging.getLogger(__name__)
+
+
+def load_artifacts(model_path: str, scaler_path: str, agent_name: str):
+    """Load a pre-trained model/scaler pair, memory-mapping numpy arrays; (None, None) if unavailable."""
+    if os.path.exists(model_path) and os.path.exists(scaler_path):
+        try:
+            return joblib.load(model_path, mmap_mode='r'), joblib.load(scaler_path, mmap_mode='r')
+        except Exception as e:
+            log.warning("%s: Could not load model: %s", agent_name, e)
+    return None, None
+
+
+class LinearRiskMixin:
+    """
+    StandardScaler + LogisticRegression risk model for an agent
+
+    Loaded artifacts are shared process-wide and read-only; inference runs on
+    float32 copies of their parameters.
+    """
+
+    def _attach_model(self, model, scaler):
+        """Use a process-wide pre-trained model/scaler pair."""
+        self.model = model
+        self.scaler = scaler
+        self.model_trained = True
+        self._quantize()
+
+    def _quantize(self):
+        """Keep float32 copies of the scaler/LR parameters for the inference dot product."""
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+        self._coef = self.model.coef_[0].astype(np.float32)
+        self._intercept = np.float32(self.model.intercept_[0])
+
+    def _predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Float32 equivalent of scaler.transform + predict_proba, without sklearn's validation overhead."""
+        X = np.asarray(X, dtype=np.float32)
+        risk = expit(((X - self._mean) / self._scale) @ self._coef + self._intercept)
+        return np.column_stack((1.0 - risk, risk))
+
+    def _fit(self, X: np.ndarray, y: np.ndarray):
+        """Fit fresh estimators, so a shared loaded model is never mutated."""
+        self.model = LogisticRegression(random_state=42, max_iter=1000)
+        self.scaler = StandardScaler()
+        self.model.fit(self.scaler.fit_transform(X), y)
+        self.model_trained = True
+        self._quantize()
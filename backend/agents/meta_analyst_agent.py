@@ -0,0 +1,78 @@
+"""
+Meta Analyst Agent
+Runs the Friction Accumulation and Ethics & Restraint reviews in ONE LLM call.
+Both roles read the same case, so a single prompt (and a single shared prefix)
+replaces two round-trips. Results are split back into the legacy shapes.
+"""
+
+from typing import List, Dict
+from models import StudentEvent
+from llm_core import get_service, format_event_log
+
+class MetaAnalystAgent:
+    def __init__(self):
+        self.name = "MetaAnalystAgent"
+        self.llm = get_service()
+        self.friction_name = "FrictionAccumulationAgent"
+        self.ethics_name = "EthicsAgent"
+        self.role_description = (
+            "You play two roles. As the FrictionAccumulationAgent you track DURATION (how long pending) "
+            "and STACKING (how many simultaneous issues) of bureaucratic friction. As the EthicsAgent you are "
+            "the ETHICAL GUARDIAN with VETO POWER: you block any automated action that threatens dignity, "
+            "privacy, or safety."
+        )
+
+    def build_prompt(self, events: List[StudentEvent], agent_outputs: List[Dict]) -> str:
+        event_log = format_event_log(events, include_severity=True)
+
+        agent_summaries = []
+        for output in agent_outputs:
+            if 'risk' in output: score = f"Risk: {output['risk']}"
+            elif 'capacity_score' in output: score = f"Capacity: {output['capacity_score']}"
+            elif 'inertia_score' in output: score = f"Inertia: {output['inertia_score']}"
+            else: score = "N/A"
+
+            agent_summaries.append(f"Agent {output.get('agent', 'Unknown')}: {score}\nReasoning: {output.get('reasoning', 'No reasoning provided')}")
+
+        context_str = "\n---\n".join(agent_summaries)
+
+        prompt = f"""
+        Task A (FrictionAccumulationAgent): Analyze the student events for FRICTION ACCUMULATION.
+        1. Identify issues that are UNRESOLVED or PENDING for a long time.
+        2. Count how many distinct bureaucratic failure types are active.
+        3. Determine if the friction is "Compounding" (getting worse).
+
+        Task B (EthicsAgent): Review the proposed system assessment, including your Task A result.
+        1. Does this intervention risk STIGMATIZING the student?
+        2. Is the data too sparse/uncertain to act? (Epistemic Humility)
+        3. Does this require HUMAN empathy rather than automation?
+        If ANY of these are true, VETO the automation and demand Human Escalation.
+
+        Return JSON with two sections:
+        "friction": risk (0-1), confidence, reasoning, key_signals, duration_days.
+        "ethics": veto (bool), veto_reasons (list), recommendation (e.g. URGENT_HUMAN_ESCALATION, SOFT_OUTREACH), ethical_assessment.
+
+        Events:
+        {event_log}
+
+        Other agents' assessments:
+        {context_str}
+        """
+        return prompt
+
+    def split_result(self, result: Dict):
+        """Split the merged response into (friction_output, ethics_output)."""
+        friction_output = result.get('friction') or {"error": result.get('error', "Missing friction section")}
+        ethics_output = result.get('ethics') or {"error": result.get('error', "Missing ethics section")}
+        friction_output['agent'] = self.friction_name
+        ethics_output['agent'] = self.ethics_name
+        return friction_output, ethics_output
+
+    def evaluate(self, events: List[StudentEvent], agent_outputs: List[Dict], student_context: Dict = None):
+        """
+        Returns (friction_output, ethics_output) in the same shapes as
+        FrictionAccumulationAgent.evaluate and EthicsAgent.evaluate.
+        """
+        prompt = self.build_prompt(events, agent_outputs)
+        result = self.llm.query_agent(self.name, prompt, {"role_description": self.role_description})
+        return self.split_result(result)
@@ -6,16 +6,17 @@ Models financial buffer, time window, and psychological bandwidth.
 
 from typing import List, Dict
 from models import StudentEvent
-from llm_core import LLMService
+from llm_core import get_service, format_event_log
 
 class RecoveryCapacityAgent:
     def __init__(self):
         self.name = "RecoveryCapacityAgent"
-        self.llm = LLMService()
+        self.llm = get_service()
         self.role_description = "You estimate the student's REMAINING CAPACITY to recover. You look for shrinking time windows and financial/emotional depletion."
 
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
-        event_log = "\n".join([f"- [{e.timestamp}] {e.event_type}: {e.description}" for e in events])
+    def build_prompt(self, events: List[StudentEvent], event_log: str = None) -> str:
+        if event_log is None:
+            event_log = format_event_log(events)
         
         prompt = f"""
         Analyze the student's RECOVERY CAPACITY based on these events.
@@ -30,5 +31,8 @@ class RecoveryCapacityAgent:
         
         Return JSON details: capacity_score, confidence, reasoning, remaining_buffer.
         """
-        
+        return prompt
+
+    def evaluate(self, events: List[StudentEvent], event_log: str = None) -> Dict:
+        prompt = self.build_prompt(events, event_log)
         return self.llm.query_agent(self.name, prompt, {"role_description": self.role_description})
@@ -4,9 +4,17 @@ Detects housing and basic needs friction
 Focus: hostel access, mess services, residential bureaucracy
 """
 #residential_agent.py
+import numpy as np
 from typing import List, Dict
-from models import StudentEvent
-from datetime import datetime, timedelta
+from models import StudentEvent, EVENT_TYPE_CODES
+from agents.features import EventBatch, count_event_types, DAY_NS
+from datetime import datetime
+
+RESIDENTIAL_CODES = np.array([EVENT_TYPE_CODES[t] for t in (
+    'hostel_access', 'mess_card', 'room_assignment', 'amenity_restriction', 'housing_payment'
+)], dtype=np.int8)
+BASIC_NEEDS_CODES = np.array([EVENT_TYPE_CODES[t] for t in ('mess_card', 'amenity_restriction')], dtype=np.int8)
+RECENT_WINDOW_NS = 21 * DAY_NS
 
 
 class ResidentialAgent:
@@ -19,7 +27,7 @@ class ResidentialAgent:
         self.name = "ResidentialAgent"
         self.weight = 0.2
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], batch: EventBatch = None) -> Dict:
         """
         Evaluate residential friction events
         
@@ -29,13 +37,11 @@ class ResidentialAgent:
         - Room assignment delays
         - Basic amenities access
         """
-        residential_events = [
-            e for e in events 
-            if e.event_type in ['hostel_access', 'mess_card', 'room_assignment', 
-                               'amenity_restriction', 'housing_payment']
-        ]
+        if batch is None:
+            batch = EventBatch.from_events(events)
+        residential_events = batch.select(RESIDENTIAL_CODES)
         
-        if not residential_events:
+        if not len(residential_events):
             return {
                 'agent': self.name,
                 'risk': 0.0,
@@ -47,28 +53,23 @@ class ResidentialAgent:
         event_count = len(residential_events)
         
         # Basic needs issues are HIGH PRIORITY
-        basic_needs_events = [
-            e for e in residential_events 
-            if e.event_type in ['mess_card', 'amenity_restriction']
-        ]
+        basic_needs_count = int(np.count_nonzero(np.isin(residential_events.event_type, BASIC_NEEDS_CODES)))
         
         # Recency matters more for residential issues
-        recent_events = [
-            e for e in residential_events 
-            if (datetime.utcnow() - e.timestamp) <= timedelta(days=21)
-        ]
+        now_ns = int(datetime.utcnow().timestamp() * 1_000_000) * 1000
+        recent_count = int(np.count_nonzero(residential_events.timestamp_ns >= now_ns - RECENT_WINDOW_NS))
         
         # Calculate risk
         base_risk = min(event_count / 4.0, 0.85)  # Housing issues are serious
-        basic_needs_multiplier = 1.0 + (len(basic_needs_events) * 0.2)  # Up to 1.6x
-        recency_factor = len(recent_events) / max(event_count, 1)
+        basic_needs_multiplier = 1.0 + (basic_needs_count * 0.2)  # Up to 1.6x
+        recency_factor = recent_count / max(event_count, 1)
         
         risk = min(base_risk * basic_needs_multiplier * (0.7 + 0.3 * recency_factor), 1.0)
         
         # Lower confidence - housing situations are complex
         confidence = min(0.55 + (event_count * 0.06), 0.88)
         
-        comment = self._generate_comment(event_count, basic_needs_events, recent_events, risk)
+        comment = self._generate_comment(event_count, basic_needs_count, recent_count, risk)
         
         return {
             'agent': self.name,
@@ -77,27 +78,23 @@ class ResidentialAgent:
             'comment': comment,
             'details': {
                 'event_count': event_count,
-                'basic_needs_events': len(basic_needs_events),
-                'recent_events': len(recent_events),
+                'basic_needs_events': basic_needs_count,
+                'recent_events': recent_count,
                 'issue_breakdown': self._breakdown_issues(residential_events)
             }
         }
     
-    def _generate_comment(self, count: int, basic_needs: List, recent: List, risk: float) -> str:
+    def _generate_comment(self, count: int, basic_needs: int, recent: int, risk: float) -> str:
         """Generate comment with emphasis on basic needs"""
-        if len(basic_needs) > 0:
-            return f"Basic needs friction detected - {len(basic_needs)} mess/amenity barriers among {count} total events"
+        if basic_needs > 0:
+            return f"Basic needs friction detected - {basic_needs} mess/amenity barriers among {count} total events"
         elif risk > 0.6:
-            return f"Significant residential friction - {count} housing-related barriers, {len(recent)} recent"
+            return f"Significant residential friction - {count} housing-related barriers, {recent} recent"
         elif risk > 0.3:
             return f"Moderate residential bureaucracy - {count} access issues"
         else:
             return "Minor residential friction"
     
-    def _breakdown_issues(self, events: List[StudentEvent]) -> Dict[str, int]:
+    def _breakdown_issues(self, batch: EventBatch) -> Dict[str, int]:
         """Break down residential issues by type"""
-        breakdown = {}
-        for event in events:
-            event_type = event.event_type
-            breakdown[event_type] = breakdown.get(event_type, 0) + 1
-        return breakdown
\ No newline at end of file
+        return count_event_types(batch.event_type)
\ No newline at end of file
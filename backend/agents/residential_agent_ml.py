@@ -7,32 +7,41 @@ import numpy as np
 from typing import List, Dict
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
 
 from models import StudentEvent
-from agents.features import extract_domain_features
+from agents.features import extract_features
+from agents.linear_risk import LinearRiskMixin, load_artifacts
 from utils.rag import DomainRAG
 from utils.llm import get_llm
 
 
-class ResidentialAgentML:
+MODEL_PATH = 'models/residential_agent.pkl'
+SCALER_PATH = 'models/residential_scaler.pkl'
+
+
+# Pre-trained model/scaler, loaded once per process
+_MODEL, _SCALER = load_artifacts(MODEL_PATH, SCALER_PATH, "ResidentialAgent")
+
+
+class ResidentialAgentML(LinearRiskMixin):
     """
     Residential friction agent with ML model, RAG, and LLM reasoning.
     """
     
+    # Domain-specific event types (class constant: no per-instance allocation)
+    DOMAIN_TYPES = frozenset({
+        'hostel_access',
+        'room_assignment',
+        'mess_card',
+        'amenity_restriction'
+    })
+    
     def __init__(self):
         self.name = "ResidentialAgent"
         self.weight = 0.25
         
-        # Domain-specific event types
-        self.domain_types = [
-            'hostel_access',
-            'room_assignment',
-            'mess_card',
-            'amenity_restriction'
-        ]
-        
         # ML Model
         self.model = LogisticRegression(random_state=42, max_iter=1000)
         self.scaler = StandardScaler()
@@ -47,47 +56,33 @@ class ResidentialAgentML:
         self._load_model()
     
     def _load_model(self):
-        """Load pre-trained model if available."""
-        model_path = 'models/residential_agent.pkl'
-        scaler_path = 'models/residential_scaler.pkl'
-        
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
-            try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
-                self.model_trained = True
-            except Exception as e:
-                pass
+        """Attach the process-wide pre-trained model if available."""
+        if _MODEL is not None:
+            self._attach_model(_MODEL, _SCALER)
     
     def train(self, X: np.ndarray, y: np.ndarray):
         """Train the ML model."""
         if len(X) < 2:
             return
         
-        X_scaled = self.scaler.fit_transform(X)
-        self.model.fit(X_scaled, y)
-        self.model_trained = True
+        self._fit(X, y)
     
     def save_model(self):
         """Save trained model to disk."""
         os.makedirs('models', exist_ok=True)
-        with open('models/residential_agent.pkl', 'wb') as f:
-            pickle.dump(self.model, f)
-        with open('models/residential_scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
+        joblib.dump(self.model, MODEL_PATH, compress=0)
+        joblib.dump(self.scaler, SCALER_PATH, compress=0)
     
-    def evaluate(self, events: List[StudentEvent]) -> Dict:
+    def evaluate(self, events: List[StudentEvent], explain: bool = True) -> Dict:
         """Evaluate residential friction with ML + RAG + LLM."""
-        residential_events = [e for e in events if e.event_type in self.domain_types]
-        features = extract_domain_features(events, self.domain_types)
+        residential_events = [e for e in events if e.event_type in self.DOMAIN_TYPES]
+        features = extract_features(residential_events)
         
         # ML Prediction
         if self.model_trained and len(features) > 0:
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            risk_prob = self.model.predict_proba(features_scaled)[0][1]
-            ml_confidence = max(self.model.predict_proba(features_scaled)[0])
+            probs = self._predict_proba(features.reshape(1, -1))[0]
+            risk_prob = probs[1]
+            ml_confidence = probs.max()
         else:
             risk_prob = self._heuristic_risk(residential_events)
             ml_confidence = 0.6
@@ -103,14 +98,15 @@ class ResidentialAgentML:
             'max_severity': float(features[2])
         }
         
-        llm_explanation = self.llm.explain_risk(
-            self.name,
-            risk_prob,
-            feature_dict,
-            context=f"RAG Context:\n{rag_context}"
-        )
+        llm_request = {
+            'agent_name': self.name,
+            'risk_score': risk_prob,
+            'features': feature_dict,
+            'context': f"RAG Context:\n{rag_context}"
+        }
+        llm_explanation = self.llm.explain_risk(**llm_request) if explain else None
         
-        return {
+        output = {
             'agent': self.name,
             'risk': round(float(risk_prob), 3),
             'confidence': round(float(ml_confidence), 3),
@@ -121,6 +117,9 @@ class ResidentialAgentML:
                 'max_severity': round(float(features[2]), 3)
             }
         }
+        if not explain:
+            output['llm_request'] = llm_request
+        return output
     
     def _heuristic_risk(self, events: List[StudentEvent]) -> float:
         """Fallback heuristic risk calculation."""
@@ -4,10 +4,20 @@ Explicit modeling of data limitations and ambiguity
 This agent REDUCES confidence when data is sparse or contradictory
 """
 
+import numpy as np
 from typing import List, Dict
 from models import StudentEvent
+from agents.features import EventBatch, DAY_NS
 from datetime import datetime, timedelta
 
+# Agents whose risk is not a domain signal (excluded from conflict variance)
+CONFLICT_EXCLUDED_AGENTS = frozenset({'UncertaintyAgent', 'EthicsAgent'})
+
+# Sparsity by event count: none, very sparse (<3), somewhat sparse (<5), acceptable (<8);
+# 8+ events is good data (SPARSITY_GOOD_DATA)
+SPARSITY_BY_COUNT = (1.0, 0.8, 0.8, 0.5, 0.5, 0.3, 0.3, 0.3)
+SPARSITY_GOOD_DATA = 0.1
+
 
 class UncertaintyAgent:
     """
@@ -19,7 +29,8 @@ class UncertaintyAgent:
         self.name = "UncertaintyAgent"
         self.weight = 0.1
     
-    def evaluate(self, events: List[StudentEvent], other_agent_outputs: List[Dict] = None) -> Dict:
+    def evaluate(self, events: List[StudentEvent], other_agent_outputs: List[Dict] = None,
+                 batch: EventBatch = None) -> Dict:
         """
         Evaluate uncertainty and data quality
         
@@ -33,7 +44,7 @@ class UncertaintyAgent:
         
         # Calculate various uncertainty factors
         data_sparsity = self._assess_sparsity(event_count)
-        temporal_staleness = self._assess_staleness(events)
+        temporal_staleness = self._assess_staleness(batch if batch is not None else events)
         signal_conflict = self._assess_conflict(other_agent_outputs) if other_agent_outputs else 0.0
         
         # Overall uncertainty score (0 = certain, 1 = highly uncertain)
@@ -64,24 +75,19 @@ class UncertaintyAgent:
     
     def _assess_sparsity(self, event_count: int) -> float:
         """Assess if we have enough data to make reliable assessments"""
-        if event_count == 0:
-            return 1.0  # Maximum uncertainty
-        elif event_count < 3:
-            return 0.8  # Very sparse
-        elif event_count < 5:
-            return 0.5  # Somewhat sparse
-        elif event_count < 8:
-            return 0.3  # Acceptable
-        else:
-            return 0.1  # Good data
+        if event_count < len(SPARSITY_BY_COUNT):
+            return SPARSITY_BY_COUNT[event_count]
+        return SPARSITY_GOOD_DATA
     
-    def _assess_staleness(self, events: List[StudentEvent]) -> float:
+    def _assess_staleness(self, events) -> float:
         """Assess if data is recent enough to be reliable"""
-        if not events:
+        if not len(events):
             return 1.0
         
-        most_recent = max(events, key=lambda x: x.timestamp)
-        days_since = (datetime.utcnow() - most_recent.timestamp).days
+        # Vectorized max over the int64 timestamp column (whole days, like timedelta.days)
+        batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+        now_ns = int(datetime.utcnow().timestamp() * 1_000_000) * 1000
+        days_since = (now_ns - int(batch.timestamp_ns.max())) // DAY_NS
         
         if days_since > 60:
             return 0.9  # Very stale
@@ -98,17 +104,16 @@ class UncertaintyAgent:
             return 0.0
         
         # Get risk scores from other agents (excluding self and ethics agent)
-        risk_scores = [
-            output['risk'] for output in agent_outputs 
-            if output['agent'] not in ['UncertaintyAgent', 'EthicsAgent']
-        ]
+        risk_scores = np.fromiter(
+            (output['risk'] for output in agent_outputs if output['agent'] not in CONFLICT_EXCLUDED_AGENTS),
+            dtype=np.float64
+        )
         
-        if len(risk_scores) < 2:
+        if risk_scores.size < 2:
             return 0.0
         
         # Calculate variance - high variance = conflicting signals
-        mean_risk = sum(risk_scores) / len(risk_scores)
-        variance = sum((r - mean_risk) ** 2 for r in risk_scores) / len(risk_scores)
+        variance = float(risk_scores.var())
         
         # Normalize variance to 0-1 range
         conflict_score = min(variance * 4, 1.0)  # Scale factor of 4
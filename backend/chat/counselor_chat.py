@@ -4,12 +4,28 @@ WebSocket-based real-time chat with consent-based identity revelation
 """
 
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List
+from collections import deque
+from typing import Deque, Dict, List
 from datetime import datetime
 import json
-import uuid
+import re
+import time
+import secrets
+
+try:
+    import ahocorasick
+except ImportError:  # a compiled regex alternation is the no-dependency path
+    ahocorasick = None
 # ---------------- MODERATION ----------------
-from moderation.professionalism_bot import check_message, generate_warning
+from moderation.professionalism_bot import check_message_async, generate_warning_async
+from chat.outbox import Outbox, encode_json
+
+# Messages kept per session (oldest dropped first)
+MESSAGE_HISTORY_LIMIT = 1000
+# How long a disconnected session's metadata/history stays available for review
+SESSION_RETENTION_SECONDS = 24 * 60 * 60
+# Concurrent student sessions per process; further connects are refused with 1013 (try again later)
+MAX_SESSIONS = 1000
 
 class CounselorChatManager:
     """
@@ -23,45 +39,57 @@ class CounselorChatManager:
     """
     
     def __init__(self):
-        # Active WebSocket connections: {session_id: websocket}
-        self.active_sessions: Dict[str, WebSocket] = {}
+        # Active WebSocket connections: {session_id: outbox}
+        self.active_sessions: Dict[str, Outbox] = {}
         
-        # Counselor connections: {counselor_id: websocket}
-        self.active_counselors: Dict[str, WebSocket] = {}
+        # Counselor connections: {counselor_id: outbox}
+        self.active_counselors: Dict[str, Outbox] = {}
         
         # Session metadata: {session_id: {...}}
         self.session_metadata: Dict[str, dict] = {}
         
-        # Message history: {session_id: [messages]}
-        self.message_history: Dict[str, List[dict]] = {}
+        # Message history: {session_id: deque of messages, capped at MESSAGE_HISTORY_LIMIT}
+        self.message_history: Dict[str, Deque[dict]] = {}
+        
+        # Disconnected sessions awaiting eviction: {session_id: monotonic disconnect time}
+        self._ended_sessions: Dict[str, float] = {}
         
         # Crisis keywords for detection
         self.crisis_keywords = [
             'suicide', 'kill myself', 'end it all', 'no reason to live',
             'hurt myself', 'self harm', 'want to die'
         ]
+        self._crisis_matcher = self._build_crisis_matcher(self.crisis_keywords)
     
     async def connect_student(self, websocket: WebSocket, session_id: str = None) -> str:
         """
         Connect a student to anonymous chat
-        Returns session_id
+        Returns session_id, or None if the server is at MAX_SESSIONS
         """
+        if len(self.active_sessions) >= MAX_SESSIONS and session_id not in self.active_sessions:
+            await websocket.close(code=1013)
+            return None
+        
         await websocket.accept()
+        self._evict_expired_sessions()
         
         if session_id is None:
-            session_id = f"anon_{uuid.uuid4().hex[:12]}"
+            session_id = f"anon_{secrets.token_hex(6)}"
         
-        self.active_sessions[session_id] = websocket
+        outbox = Outbox(websocket)
+        self._close_outbox(self.active_sessions.get(session_id))
+        self.active_sessions[session_id] = outbox
+        self._ended_sessions.pop(session_id, None)
         self.session_metadata[session_id] = {
             'started_at': datetime.utcnow().isoformat(),
             'is_anonymous': True,
             'student_id': None,
             'assigned_counselor': None
         }
-        self.message_history[session_id] = []
+        self.message_history[session_id] = deque(maxlen=MESSAGE_HISTORY_LIMIT)
         
         # Notify student
-        await websocket.send_json({
+        await outbox.send_json({
             'type': 'connection_established',
             'session_id': session_id,
             'message': 'Connected anonymously. A counselor will join shortly.',
@@ -76,7 +104,8 @@ class CounselorChatManager:
     async def connect_counselor(self, websocket: WebSocket, counselor_id: str):
         """Connect a counselor to the chat system"""
         await websocket.accept()
-        self.active_counselors[counselor_id] = websocket
+        self._close_outbox(self.active_counselors.get(counselor_id))
+        self.active_counselors[counselor_id] = Outbox(websocket)
         
         # Send list of active sessions
         await self._send_active_sessions(counselor_id)
@@ -87,12 +116,12 @@ class CounselorChatManager:
         if not websocket:
             return
 
-        is_allowed, processed_message = check_message(message)
+        is_allowed, processed_message = await check_message_async(message)
 
         if not is_allowed:
             await websocket.send_json({
                 "type": "moderation_notice",
-                "message": generate_warning(message),
+                "message": await generate_warning_async(message),
                 "timestamp": datetime.utcnow().isoformat()
             })
             return
@@ -209,19 +238,43 @@ class CounselorChatManager:
                     'message': 'Student declined to share identity - please continue anonymous support'
                 })
     
+    @staticmethod
+    def _build_crisis_matcher(keywords: List[str]):
+        """Compile the keywords once into a single-pass, case-insensitive matcher"""
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            return lambda text: next(automaton.iter(text.lower()), None) is not None
+        
+        # The regex matches case-insensitively, so no lowered copy of the message is needed
+        pattern = re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+        return lambda text: pattern.search(text) is not None
+    
     def _detect_crisis(self, message: str) -> bool:
         """Detect crisis keywords in message"""
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in self.crisis_keywords)
+        return self._crisis_matcher(message)
+    
+    def _evict_expired_sessions(self):
+        """Drop metadata/history of sessions disconnected longer than the retention window"""
+        cutoff = time.monotonic() - SESSION_RETENTION_SECONDS
+        expired = [sid for sid, ended_at in self._ended_sessions.items() if ended_at < cutoff]
+        for session_id in expired:
+            del self._ended_sessions[session_id]
+            self.session_metadata.pop(session_id, None)
+            self.message_history.pop(session_id, None)
     
     async def _notify_counselors_new_session(self, session_id: str):
         """Notify all active counselors of new session"""
-        for counselor_id, websocket in self.active_counselors.items():
-            await websocket.send_json({
-                'type': 'new_session',
-                'session_id': session_id,
-                'message': 'New anonymous student session started'
-            })
+        payload = encode_json({
+            'type': 'new_session',
+            'session_id': session_id,
+            'message': 'New anonymous student session started'
+        })
+        for outbox in self.active_counselors.values():
+            if not outbox.closed:
+                await outbox.send_text(payload)
     
     async def _send_active_sessions(self, counselor_id: str):
         """Send list of active sessions to counselor"""
@@ -229,15 +282,16 @@ class CounselorChatManager:
         if not counselor_ws:
             return
         
+        # Walk only the connected sessions; metadata is retained for disconnected ones too
         sessions = []
-        for session_id, metadata in self.session_metadata.items():
-            if session_id in self.active_sessions:
-                sessions.append({
-                    'session_id': session_id,
-                    'started_at': metadata['started_at'],
-                    'is_anonymous': metadata['is_anonymous'],
-                    'assigned_counselor': metadata.get('assigned_counselor')
-                })
+        for session_id in self.active_sessions:
+            metadata = self.session_metadata[session_id]
+            sessions.append({
+                'session_id': session_id,
+                'started_at': metadata['started_at'],
+                'is_anonymous': metadata['is_anonymous'],
+                'assigned_counselor': metadata.get('assigned_counselor')
+            })
         
         await counselor_ws.send_json({
             'type': 'active_sessions',
@@ -247,11 +301,17 @@ class CounselorChatManager:
     async def disconnect(self, session_id: str = None, counselor_id: str = None):
         """Handle disconnection"""
         if session_id and session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-            # Keep metadata and history for review
+            self._close_outbox(self.active_sessions.pop(session_id))
+            # Keep metadata and history for review until SESSION_RETENTION_SECONDS pass
+            self._ended_sessions[session_id] = time.monotonic()
         
         if counselor_id and counselor_id in self.active_counselors:
-            del self.active_counselors[counselor_id]
+            self._close_outbox(self.active_counselors.pop(counselor_id))
+    
+    @staticmethod
+    def _close_outbox(outbox: Outbox = None):
+        if outbox is not None:
+            outbox.close()
 
 
 # Global chat manager instance
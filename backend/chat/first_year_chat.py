@@ -4,9 +4,21 @@ Topic-based chat rooms with optional anonymity and moderation
 """
 
 from fastapi import WebSocket
-from typing import Dict, List
+from collections import deque
+from itertools import islice
+import asyncio
+import logging
+from typing import Deque, Dict
 from datetime import datetime
-import uuid
+import secrets
+from chat.outbox import Outbox, encode_json
+from chat.history_store import ChatHistoryWriter, load_recent_history
+from moderation.professionalism_bot import check_message_async, generate_warning_async
+
+# Messages kept per room (oldest dropped first)
+MESSAGE_HISTORY_LIMIT = 1000
+
+moderation_log = logging.getLogger("moderation")
 
 
 class CommunityChatManager:
@@ -16,8 +28,8 @@ class CommunityChatManager:
 
     def __init__(self):
         self.rooms: Dict[str, dict] = {}
-        self.connections: Dict[str, Dict[str, WebSocket]] = {}
-        self.message_history: Dict[str, List[dict]] = {}
+        self.message_history: Dict[str, Deque[dict]] = {}
+        self.history_writer = ChatHistoryWriter()
 
         self._initialize_default_rooms()
 
@@ -53,11 +65,21 @@ class CommunityChatManager:
             self.rooms[room['id']] = {
                 **room,
                 'created_at': datetime.utcnow().isoformat(),
-                'active_users': set(),
+                'connections': {},   # user_id -> Outbox (broadcasts iterate this directly)
                 'message_count': 0,
                 'user_names': {}   # ✅ FIX 3: persistent identities
             }
-            self.message_history[room['id']] = []
+            self.message_history[room['id']] = deque(maxlen=MESSAGE_HISTORY_LIMIT)
+
+    async def start_history_persistence(self):
+        """Restore recent room history from the database and start persisting new messages"""
+        history = await asyncio.to_thread(load_recent_history, list(self.rooms), MESSAGE_HISTORY_LIMIT)
+        for room_id, messages in history.items():
+            self.message_history[room_id].extend(messages)
+        self.history_writer.start()
+
+    async def stop_history_persistence(self):
+        await self.history_writer.stop()
 
     async def join_room(
         self,
@@ -83,13 +105,15 @@ class CommunityChatManager:
         await websocket.accept()
 
         # store connection
-        self.connections.setdefault(user_id, {})
-        self.connections[user_id][room_id] = websocket
-        room['active_users'].add(user_id)
+        outbox = Outbox(websocket)
+        previous = room['connections'].get(user_id)
+        if previous is not None:
+            previous.close()
+        room['connections'][user_id] = outbox
 
         # ✅ FIX: ALWAYS define final_display_name
         if is_anonymous:
-            final_display_name = f"Anonymous{uuid.uuid4().hex[:4]}"
+            final_display_name = f"Anonymous{secrets.token_hex(2)}"
         elif display_name:
             final_display_name = display_name
         else:
@@ -108,7 +132,7 @@ class CommunityChatManager:
             exclude_user=user_id
         )
 
-        await self._send_recent_history(websocket, room_id)
+        await self._send_recent_history(outbox, room_id)
         return True
 
 
@@ -121,44 +145,24 @@ class CommunityChatManager:
         display_name: str = None,
         client_id: str = None
     ):
-
-
-        if room_id not in self.rooms:
+        room = self.rooms.get(room_id)
+        if room is None:
             return
 
-        from moderation.professionalism_bot import check_message, generate_warning
-
         # Moderate message
-        is_appropriate, moderated_message = check_message(message)
+        is_appropriate, moderated_message = await check_message_async(message)
 
         # ✅ FIX 4: server-side moderation log
-        print("[MODERATION]", {
-            "room": room_id,
-            "user": user_id,
-            "message": message,
-            "allowed": is_appropriate
-        })
+        moderation_log.info(
+            "[MODERATION] room=%s user=%s allowed=%s message=%r",
+            room_id, user_id, is_appropriate, message
+        )
 
-        room = self.rooms[room_id]
-        final_display_name = room['user_names'].get(user_id, "User")
+        timestamp = datetime.utcnow().isoformat()
 
-        # ❌ BLOCKED MESSAGE FLOW
+        # ❌ BLOCKED MESSAGE FLOW (rare; kept out of the common path)
         if not is_appropriate:
-            # private warning to sender
-            user_ws = self.connections.get(user_id, {}).get(room_id)
-            if user_ws:
-                await user_ws.send_json({
-                    'type': 'moderation_notice',
-                    'message': generate_warning(message),
-                    'timestamp': datetime.utcnow().isoformat()
-                })
-
-            # ✅ FIX 5: visible system message
-            await self._broadcast_to_room(room_id, {
-                'type': 'system',
-                'message': '⚠️ A message was removed for violating community guidelines.',
-                'timestamp': datetime.utcnow().isoformat()
-            })
+            await self._handle_blocked_message(room_id, room, user_id, message, timestamp)
             return
 
         # ✅ NORMAL MESSAGE FLOW (FIX 2)
@@ -166,33 +170,46 @@ class CommunityChatManager:
             'type': 'chat_message',
             'room_id': room_id,
             'user_id': None if is_anonymous else user_id,
-            'display_name': final_display_name,
+            'display_name': room['user_names'].get(user_id, "User"),
             'message': moderated_message,
             'client_id': client_id,  # ✅ SAFE NOW
             'is_anonymous': is_anonymous,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': timestamp
         }
 
-
-
-
         self.message_history[room_id].append(msg_data)
+        self.history_writer.enqueue(room_id, msg_data)
         room['message_count'] += 1
 
         await self._broadcast_to_room(room_id, msg_data)
 
+    async def _handle_blocked_message(self, room_id: str, room: dict, user_id: str, message: str, timestamp: str):
+        # private warning to sender
+        user_ws = room['connections'].get(user_id)
+        if user_ws:
+            await user_ws.send_json({
+                'type': 'moderation_notice',
+                'message': await generate_warning_async(message),
+                'timestamp': timestamp
+            })
+
+        # ✅ FIX 5: visible system message
+        await self._broadcast_to_room(room_id, {
+            'type': 'system',
+            'message': '⚠️ A message was removed for violating community guidelines.',
+            'timestamp': timestamp
+        })
+
     async def leave_room(self, room_id: str, user_id: str):
         if room_id not in self.rooms:
             return
 
         room = self.rooms[room_id]
-        room['active_users'].discard(user_id)
         room['user_names'].pop(user_id, None)
 
-        if user_id in self.connections:
-            self.connections[user_id].pop(room_id, None)
-            if not self.connections[user_id]:
-                del self.connections[user_id]
+        outbox = room['connections'].pop(user_id, None)
+        if outbox is not None:
+            outbox.close()
 
         await self._broadcast_to_room(room_id, {
             'type': 'user_left',
@@ -204,21 +221,32 @@ class CommunityChatManager:
         if not room:
             return
 
-        for uid in list(room['active_users']):
+        # Nobody to deliver to: skip the serialization too
+        connections = room['connections']
+        if not connections or (len(connections) == 1 and exclude_user in connections):
+            return
+
+        # Serialize once; each outbox only queues it, and the per-connection
+        # flushers do the network sends concurrently
+        payload = encode_json(message)
+        dead = []
+        for uid, outbox in connections.items():
             if exclude_user and uid == exclude_user:
                 continue
-            ws = self.connections.get(uid, {}).get(room_id)
-            if ws:
-                try:
-                    await ws.send_json(message)
-                except:
-                    await self.leave_room(room_id, uid)
-
-    async def _send_recent_history(self, websocket: WebSocket, room_id: str, limit: int = 50):
-        history = self.message_history.get(room_id, [])
-        await websocket.send_json({
+            try:
+                await outbox.send_text(payload)
+            except RuntimeError:  # outbox closed after a failed send
+                dead.append(uid)
+
+        # Evict after the fan-out so leave_room's own broadcast never runs mid-iteration
+        for uid in dead:
+            await self.leave_room(room_id, uid)
+
+    async def _send_recent_history(self, outbox: Outbox, room_id: str, limit: int = 50):
+        history = self.message_history.get(room_id, ())
+        await outbox.send_json({
             'type': 'message_history',
-            'messages': history[-limit:]
+            'messages': list(islice(history, max(0, len(history) - limit), None))
         })
 
 
@@ -0,0 +1,102 @@
+"""
+Community Chat History Store
+Write-behind persistence of room messages so history survives restarts
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import insert, select
+
+from database import SessionLocal
+from models import ChatMessage
+
+# A flush writes at most this many messages, and waits at most this long to fill a batch
+HISTORY_BATCH_SIZE = 100
+HISTORY_FLUSH_INTERVAL_SECONDS = 0.05
+
+log = logging.getLogger(__name__)
+
+
+class ChatHistoryWriter:
+    """
+    Queues room messages on the event loop and inserts them in batches
+
+    The chat path only does a put_nowait; a single background task groups
+    messages and runs each batch INSERT in a worker thread, so database
+    latency never blocks message delivery.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def enqueue(self, room_id: str, message: dict):
+        if self._queue is not None:
+            self._queue.put_nowait((room_id, message))
+
+    async def stop(self):
+        """Stop the writer once everything queued so far has been written"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)  # sentinel: queued behind every pending message
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + HISTORY_FLUSH_INTERVAL_SECONDS
+            while len(batch) < HISTORY_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                log.warning("Could not persist %d chat messages: %s", len(batch), e)
+
+    @staticmethod
+    def _write(batch: List[tuple]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(ChatMessage), [{'room_id': room_id, 'payload': message} for room_id, message in batch])
+            db.commit()
+        finally:
+            db.close()
+
+
+def load_recent_history(room_ids: List[str], limit: int) -> Dict[str, List[dict]]:
+    """Most recent `limit` persisted messages per room, oldest first"""
+    db = SessionLocal()
+    try:
+        history = {}
+        for room_id in room_ids:
+            rows = db.execute(
+                select(ChatMessage.payload)
+                .where(ChatMessage.room_id == room_id)
+                .order_by(ChatMessage.id.desc())
+                .limit(limit)
+            ).scalars().all()
+            history[room_id] = rows[::-1]
+        return history
+    finally:
+        db.close()
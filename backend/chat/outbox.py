@@ -0,0 +1,105 @@
+"""
+WebSocket Outbox
+Coalesces messages sent in the same event-loop tick into a single frame
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from fastapi import WebSocket
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback; same output, just slower
+    orjson = None
+
+# Messages a slow client may have waiting before the oldest droppable one is discarded
+OUTBOX_MAX_PENDING = 256
+# Never dropped under backpressure
+CRITICAL_MESSAGE_TYPES = frozenset({'crisis_alert'})
+
+log = logging.getLogger(__name__)
+
+
+def encode_json(message: dict) -> str:
+    """Serialize a message to the same compact UTF-8 JSON WebSocket.send_json sends"""
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_json(text: str):
+    """Parse an incoming text frame"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class Outbox:
+    """
+    Per-connection send queue drained by one background flusher task
+
+    Messages queued back-to-back (e.g. a student echo, the counselor copy and a
+    crisis alert) go out as one {"type": "batch", "items": [...]} frame; a lone
+    message is sent unwrapped. Order is preserved per connection.
+
+    A client that falls OUTBOX_MAX_PENDING messages behind loses its oldest
+    non-critical messages instead of growing the queue without bound.
+
+    `write_delay` (seconds) widens the coalescing window beyond one tick,
+    trading that much latency for fewer frames.
+    """
+
+    def __init__(self, websocket: WebSocket, write_delay: float = 0.0):
+        self.websocket = websocket
+        self.write_delay = write_delay
+        self.closed = False
+        self._pending = deque()  # (payload, critical)
+        self._ready = asyncio.Event()
+        self._flusher = None
+
+    async def send_json(self, message: dict):
+        await self.send_text(encode_json(message), message.get('type') in CRITICAL_MESSAGE_TYPES)
+
+    async def send_text(self, payload: str, critical: bool = False):
+        """Queue an already-encoded JSON message"""
+        if self.closed:
+            raise RuntimeError("WebSocket outbox is closed")
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush())
+        if len(self._pending) >= OUTBOX_MAX_PENDING:
+            self._drop_oldest()
+        self._pending.append((payload, critical))
+        self._ready.set()
+
+    def _drop_oldest(self):
+        for index, (_, critical) in enumerate(self._pending):
+            if not critical:
+                del self._pending[index]
+                log.warning("Outbox backlog full; dropped oldest pending message")
+                return
+
+    async def _flush(self):
+        while True:
+            await self._ready.wait()
+            # Let the rest of this tick's (or write window's) sends land before framing
+            await asyncio.sleep(self.write_delay)
+            items = [payload for payload, _ in self._pending]
+            self._pending.clear()
+            self._ready.clear()
+
+            frame = items[0] if len(items) == 1 else '{"type":"batch","items":[' + ','.join(items) + ']}'
+            try:
+                await self.websocket.send_text(frame)
+            except Exception:
+                self.closed = True
+                return
+
+    def close(self):
+        """Stop the flusher; queued messages for a gone socket are dropped"""
+        self.closed = True
+        self._pending.clear()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
@@ -4,10 +4,25 @@ Connects first-year students with verified senior mentors based on course/batch
 """
 
 from fastapi import WebSocket
-from typing import Dict, List, Optional
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional
 from datetime import datetime
-import uuid
-from moderation.professionalism_bot import check_message, generate_warning
+import asyncio
+import secrets
+from moderation.professionalism_bot import check_message_async, generate_warning_async
+from chat.outbox import Outbox
+from chat.senior_store import load_student_state, save_match, save_profile
+
+# Messages kept per session (oldest dropped first)
+MESSAGE_HISTORY_LIMIT = 1000
+# Outbound messages queued within this window share one WebSocket frame
+CLIENT_WRITE_DELAY_SECONDS = 0.01
+# Replayed to a reconnecting user, HISTORY_CHUNK_SIZE messages per chunk
+HISTORY_REPLAY_LIMIT = 50
+HISTORY_CHUNK_SIZE = 10
+# Distinct (course, batch) lookups remembered before the match cache is reset
+MATCH_CACHE_SIZE = 512
 
 
 class SeniorChatManager:
@@ -22,11 +37,11 @@ class SeniorChatManager:
     """
     
     def __init__(self):
-        # Active student connections: {student_id: websocket}
-        self.student_connections: Dict[str, WebSocket] = {}
+        # Active student connections: {student_id: outbox}
+        self.student_connections: Dict[str, Outbox] = {}
         
-        # Active senior connections: {senior_id: websocket}
-        self.senior_connections: Dict[str, WebSocket] = {}
+        # Active senior connections: {senior_id: outbox}
+        self.senior_connections: Dict[str, Outbox] = {}
         
         # Active chat sessions: {session_id: {...}}
         self.active_sessions: Dict[str, dict] = {}
@@ -34,8 +49,12 @@ class SeniorChatManager:
         # Student profiles: {student_id: {course, batch, matched_senior_id}}
         self.student_profiles: Dict[str, dict] = {}
         
-        # Message history: {session_id: [messages]}
-        self.message_history: Dict[str, List[dict]] = {}
+        # Message history: {session_id: deque of (sender, message, timestamp, client_id)}
+        # Compact tuples; the full message dicts are rebuilt only when history is replayed
+        self.message_history: Dict[str, Deque[tuple]] = {}
+        
+        # Messages rolled out of a full history: {session_id: {count, student, senior, first/last_timestamp}}
+        self.history_summaries: Dict[str, dict] = {}
         
         # Demo senior database - in production, this would come from DB
         self.available_seniors = {
@@ -80,6 +99,34 @@ class SeniorChatManager:
                 'available': True
             }
         }
+        
+        self._refresh_senior_index()
+    
+    def _refresh_senior_index(self):
+        """Rebuild derived lookups; call after any change to available_seniors"""
+        # Lowercased course -> [(batch_year, senior_id, senior)] in directory order
+        self._seniors_by_course = self._index_seniors_by_course(self.available_seniors)
+        # (course, batch_year) -> match list and course -> senior list; callers get copies
+        self._match_cache: Dict[tuple, List[dict]] = {}
+        self._available_cache: Dict[Optional[str], List[dict]] = {}
+    
+    async def _load_student_state(self, student_id: str):
+        profile, session = await asyncio.to_thread(load_student_state, student_id)
+        if profile is None:
+            return
+        self.student_profiles[student_id] = profile
+        if session is not None:
+            session_id = session['session_id']
+            self.active_sessions[session_id] = session
+            self.message_history.setdefault(session_id, deque(maxlen=MESSAGE_HISTORY_LIMIT))
+    
+    @staticmethod
+    def _index_seniors_by_course(seniors: Dict[str, dict]) -> Dict[str, List[tuple]]:
+        index: Dict[str, List[tuple]] = {}
+        for senior_id, senior in seniors.items():
+            batch_year = int(senior['batch']) if senior['batch'].isdigit() else 0
+            index.setdefault(senior['course'].lower(), []).append((batch_year, senior_id, senior))
+        return index
     
     async def connect_student(
         self,
@@ -93,7 +140,14 @@ class SeniorChatManager:
         Returns matching status and available seniors
         """
         await websocket.accept()
-        self.student_connections[student_id] = websocket
+        outbox = Outbox(websocket, write_delay=CLIENT_WRITE_DELAY_SECONDS)
+        self._close_outbox(self.student_connections.get(student_id))
+        self.student_connections[student_id] = outbox
+        
+        # Profiles and matches are shared through the database; pick up one
+        # created by another worker (or before a restart)
+        if student_id not in self.student_profiles:
+            await self._load_student_state(student_id)
         
         # Check if student has existing profile
         if student_id in self.student_profiles:
@@ -104,7 +158,7 @@ class SeniorChatManager:
                 session_id = profile.get('session_id')
                 if session_id in self.active_sessions:
                     # Resume existing session
-                    await self._send_session_history(websocket, session_id)
+                    await self._send_session_history(outbox, session_id)
                     return {
                         'status': 'resumed',
                         'session_id': session_id,
@@ -121,9 +175,10 @@ class SeniorChatManager:
                     'session_id': None,
                     'created_at': datetime.utcnow().isoformat()
                 }
+                await asyncio.to_thread(save_profile, self.student_profiles[student_id])
         
         # Send connection confirmation
-        await websocket.send_json({
+        await outbox.send_json({
             'type': 'connection_established',
             'message': 'Connected to Senior Mentorship Chat',
             'has_profile': student_id in self.student_profiles
@@ -150,6 +205,7 @@ class SeniorChatManager:
             'session_id': None,
             'created_at': datetime.utcnow().isoformat()
         }
+        await asyncio.to_thread(save_profile, self.student_profiles[student_id])
         
         # Find matching seniors (same course, earlier batch)
         matching_seniors = self._find_matching_seniors(course, batch)
@@ -183,7 +239,7 @@ class SeniorChatManager:
             return {'success': False, 'error': 'Senior not found'}
         
         # Create new session
-        session_id = f"senior_session_{uuid.uuid4().hex[:12]}"
+        session_id = f"senior_session_{secrets.token_hex(6)}"
         
         self.active_sessions[session_id] = {
             'session_id': session_id,
@@ -198,12 +254,12 @@ class SeniorChatManager:
         self.student_profiles[student_id]['session_id'] = session_id
         
         # Initialize message history
-        self.message_history[session_id] = []
+        self.message_history[session_id] = deque(maxlen=MESSAGE_HISTORY_LIMIT)
         
-        # Notify student
+        # Notify student (the outboxes only queue, so both notifications go out concurrently)
+        senior_info = self.available_seniors[senior_id]
         student_ws = self.student_connections.get(student_id)
         if student_ws:
-            senior_info = self.available_seniors[senior_id]
             await student_ws.send_json({
                 'type': 'match_created',
                 'session_id': session_id,
@@ -222,6 +278,9 @@ class SeniorChatManager:
                 'batch': self.student_profiles[student_id]['batch']
             })
         
+        # Persist after notifying so the database write is off the handshake's critical path
+        await asyncio.to_thread(save_match, self.student_profiles[student_id], self.active_sessions[session_id])
+        
         return {
             'success': True,
             'session_id': session_id,
@@ -246,14 +305,14 @@ class SeniorChatManager:
 
         # ------------------ MODERATION (STUDENT ONLY) ------------------
 
-        is_allowed, processed_message = check_message(message)
+        is_allowed, processed_message = await check_message_async(message)
 
         if not is_allowed:
             student_ws = self.student_connections.get(student_id)
             if student_ws:
                 await student_ws.send_json({
                     "type": "moderation_notice",
-                    "message": generate_warning(message)
+                    "message": await generate_warning_async(message)
                 })
             return
 
@@ -271,7 +330,7 @@ class SeniorChatManager:
         }
         
         # Store in history
-        self.message_history[session_id].append(msg_data)
+        self._record_history(session_id, ('student', message, msg_data['timestamp'], client_id))
         
         # Send to senior
         senior_id = session['senior_id']
@@ -310,7 +369,7 @@ class SeniorChatManager:
         }
         
         # Store in history
-        self.message_history[session_id].append(msg_data)
+        self._record_history(session_id, ('senior', message, msg_data['timestamp'], None))
         
         # Send to student
         student_id = session['student_id']
@@ -322,16 +381,16 @@ class SeniorChatManager:
         """
         Find seniors matching the student's course and from earlier batches
         """
-        matching = []
         student_batch_year = int(batch) if batch.isdigit() else 9999
+        key = (course.lower(), student_batch_year)
+        cached = self._match_cache.get(key)
+        if cached is not None:
+            return [dict(senior) for senior in cached]
         
-        for senior_id, senior in self.available_seniors.items():
-            # Match by course
-            if senior['course'].lower() != course.lower():
-                continue
-            
+        matching = []
+        # Match by course
+        for senior_batch_year, senior_id, senior in self._seniors_by_course.get(course.lower(), ()):
             # Senior should be from earlier batch
-            senior_batch_year = int(senior['batch']) if senior['batch'].isdigit() else 0
             if senior_batch_year >= student_batch_year:
                 continue
             
@@ -350,25 +409,101 @@ class SeniorChatManager:
         # Sort by years ahead (closer batches first)
         matching.sort(key=lambda x: x['years_ahead'])
         
-        return matching
+        if len(self._match_cache) >= MATCH_CACHE_SIZE:
+            self._match_cache.clear()
+        self._match_cache[key] = matching
+        return [dict(senior) for senior in matching]
     
-    async def _send_session_history(self, websocket: WebSocket, session_id: str):
-        """Send recent message history to reconnecting user"""
-        history = self.message_history.get(session_id, [])
-        await websocket.send_json({
-            'type': 'message_history',
-            'messages': history[-50:]  # Last 50 messages
-        })
+    def _record_history(self, session_id: str, entry: tuple):
+        """Append to session history, folding the entry it evicts into the session summary"""
+        history = self.message_history[session_id]
+        if len(history) == history.maxlen:
+            self._summarize(self.history_summaries.setdefault(session_id, {}), (history[0],))
+        history.append(entry)
+    
+    @staticmethod
+    def _summarize(summary: dict, entries) -> dict:
+        """Fold history entries (oldest first) into a metadata-only summary"""
+        for sender, _, timestamp, _ in entries:
+            summary['count'] = summary.get('count', 0) + 1
+            summary[sender] = summary.get(sender, 0) + 1
+            summary.setdefault('first_timestamp', timestamp)
+            summary['last_timestamp'] = timestamp
+        return summary
+    
+    async def _send_session_history(self, outbox: Outbox, session_id: str):
+        """
+        Send recent message history to reconnecting user in small chunks,
+        yielding to the event loop between them
+        """
+        history = self.message_history.get(session_id, ())
+        replay_start = max(0, len(history) - HISTORY_REPLAY_LIMIT)
+        
+        # Everything older than the replayed window goes out as one summary
+        summary = dict(self.history_summaries.get(session_id, {}))
+        self._summarize(summary, islice(history, replay_start))
+        if summary:
+            await outbox.send_json({
+                'type': 'message_history_summary',
+                'session_id': session_id,
+                'count': summary['count'],
+                'student': summary.get('student', 0),
+                'senior': summary.get('senior', 0),
+                'first_timestamp': summary['first_timestamp'],
+                'last_timestamp': summary['last_timestamp']
+            })
+        
+        # Snapshot: messages recorded while this yields between chunks must not mutate the iteration
+        recent = iter(list(islice(history, replay_start, None)))
+        seq = 0
+        while True:
+            chunk = [self._history_message(session_id, entry) for entry in islice(recent, HISTORY_CHUNK_SIZE)]
+            if not chunk:
+                break
+            await outbox.send_json({
+                'type': 'message_history_chunk',
+                'seq': seq,
+                'items': chunk
+            })
+            seq += 1
+            await asyncio.sleep(0)
+        await outbox.send_json({'type': 'message_history_end', 'chunks': seq})
+    
+    @staticmethod
+    def _history_message(session_id: str, entry: tuple) -> dict:
+        """Rebuild the message dict originally sent for a stored history entry"""
+        sender, message, timestamp, client_id = entry
+        if sender == 'student':
+            return {
+                'type': 'student_message',
+                'session_id': session_id,
+                'sender': sender,
+                'message': message,
+                'client_id': client_id,
+                'timestamp': timestamp
+            }
+        return {
+            'type': 'senior_message',
+            'session_id': session_id,
+            'sender': sender,
+            'message': message,
+            'timestamp': timestamp
+        }
     
     async def disconnect_student(self, student_id: str):
         """Handle student disconnection"""
         if student_id in self.student_connections:
-            del self.student_connections[student_id]
+            self._close_outbox(self.student_connections.pop(student_id))
     
     async def disconnect_senior(self, senior_id: str):
         """Handle senior disconnection"""
         if senior_id in self.senior_connections:
-            del self.senior_connections[senior_id]
+            self._close_outbox(self.senior_connections.pop(senior_id))
+    
+    @staticmethod
+    def _close_outbox(outbox: Outbox = None):
+        if outbox is not None:
+            outbox.close()
     
     def get_student_profile(self, student_id: str) -> Optional[dict]:
         """Get student profile if exists"""
@@ -376,10 +511,18 @@ class SeniorChatManager:
     
     def get_available_seniors(self, course: str = None) -> List[dict]:
         """Get list of all available seniors, optionally filtered by course"""
+        key = course.lower() if course else None
+        cached = self._available_cache.get(key)
+        if cached is not None:
+            return [dict(senior) for senior in cached]
+        
+        if course:
+            candidates = [(senior_id, senior) for _, senior_id, senior in self._seniors_by_course.get(course.lower(), ())]
+        else:
+            candidates = self.available_seniors.items()
+        
         seniors = []
-        for senior_id, senior in self.available_seniors.items():
-            if course and senior['course'].lower() != course.lower():
-                continue
+        for senior_id, senior in candidates:
             if senior.get('available', True):
                 seniors.append({
                     'id': senior_id,
@@ -388,7 +531,11 @@ class SeniorChatManager:
                     'batch': senior['batch'],
                     'specializations': senior['specializations']
                 })
-        return seniors
+        
+        if len(self._available_cache) >= MATCH_CACHE_SIZE:
+            self._available_cache.clear()
+        self._available_cache[key] = seniors
+        return [dict(senior) for senior in seniors]
 
 
 # Global instance
@@ -0,0 +1,51 @@
+"""
+Senior Chat Store
+Write-through persistence of mentorship profiles and sessions, so every
+worker process (and a restarted one) sees the same matches
+"""
+
+from typing import Optional, Tuple
+
+from database import SessionLocal
+from models import SeniorChatProfile, SeniorChatSession
+
+PROFILE_FIELDS = ('student_id', 'course', 'batch', 'matched_senior_id', 'session_id', 'created_at')
+SESSION_FIELDS = ('session_id', 'student_id', 'senior_id', 'started_at', 'status')
+
+
+def save_profile(profile: dict):
+    db = SessionLocal()
+    try:
+        db.merge(SeniorChatProfile(**{field: profile.get(field) for field in PROFILE_FIELDS}))
+        db.commit()
+    finally:
+        db.close()
+
+
+def save_match(profile: dict, session: dict):
+    """Persist a new session together with the profile that now points at it"""
+    db = SessionLocal()
+    try:
+        db.merge(SeniorChatSession(**{field: session.get(field) for field in SESSION_FIELDS}))
+        db.merge(SeniorChatProfile(**{field: profile.get(field) for field in PROFILE_FIELDS}))
+        db.commit()
+    finally:
+        db.close()
+
+
+def load_student_state(student_id: str) -> Tuple[Optional[dict], Optional[dict]]:
+    """(profile, matched session) for a student, either of which may be None"""
+    db = SessionLocal()
+    try:
+        row = db.get(SeniorChatProfile, student_id)
+        if row is None:
+            return None, None
+        profile = {field: getattr(row, field) for field in PROFILE_FIELDS}
+        session = None
+        if row.session_id:
+            session_row = db.get(SeniorChatSession, row.session_id)
+            if session_row is not None:
+                session = {field: getattr(session_row, field) for field in SESSION_FIELDS}
+        return profile, session
+    finally:
+        db.close()
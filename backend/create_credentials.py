@@ -41,10 +41,13 @@ credentials = {
     }
 }
 
+# Encode once; the same text is written to the file and echoed below
+credentials_json = json.dumps(credentials, indent=2)
+
 # Save to file
 output_file = "credentials.json"
 with open(output_file, 'w') as f:
-    json.dump(credentials, f, indent=2)
+    f.write(credentials_json)
 
 print()
 print("="*60)
@@ -52,7 +55,7 @@ print(f"✓ SUCCESS! Created {output_file}")
 print("="*60)
 print()
 print("File contents:")
-print(json.dumps(credentials, indent=2))
+print(credentials_json)
 print()
 print("Your credentials.json file is ready to use!")
 print("Location:", output_file)
@@ -3,20 +3,41 @@ TRACES+ Database Configuration
 SQLite-based database for hackathon deployment
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool
 
 DATABASE_URL = "sqlite:///./traces.db"
 
-# Configure engine with thread safety for SQLite
+# Sync routes run on FastAPI's worker threadpool (40 threads by default), so up
+# to 30 sessions can be open at once before a request waits for a connection
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+
+# Configure engine with thread safety for SQLite; WAL (below) lets pooled
+# connections read while another writes
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     echo=False  # Set to True for SQL debugging
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal with NORMAL sync, in-memory temp tables, 256 MB mmap, 64 MB page cache"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
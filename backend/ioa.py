@@ -5,7 +5,7 @@ Autonomous agent that orchestrates interventions
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, joinedload
 import json
 import secrets
 
@@ -78,20 +78,23 @@ class InterventionOrchestratorAgent:
             'context': self._gather_context(student, events)
         }
         
-        # Store observation
-        for pattern_type, pattern_data in observations['patterns'].items():
-            obs = AgentObservation(
+        # Store observations in one multi-row insert
+        observed_at = datetime.utcnow()
+        AgentObservation.bulk_insert(self.db, [
+            dict(
                 student_id=student_id,
                 observation_type=pattern_type,
                 metric_name='risk_trend',
                 metric_value=observations['current_risk'],
                 metric_text=json.dumps(pattern_data),
                 anomaly_detected=len(observations['anomalies']) > 0,
+                anomaly_type=observations['anomalies'][0]['type'] if observations['anomalies'] else None,
                 severity=observations['current_risk'],
                 pattern_type=risk_trend,
-                observed_at=datetime.utcnow()
+                observed_at=observed_at
             )
-            self.db.add(obs)
+            for pattern_type, pattern_data in observations['patterns'].items()
+        ])
         
         self.db.commit()
         
@@ -255,6 +258,7 @@ class InterventionOrchestratorAgent:
             current_risk_score=observations['current_risk'],
             risk_trend=observations['risk_trend'],
             risk_velocity=observations['risk_velocity'],
+            department=observations['context'].get('department'),
             goal=f"Reduce dropout probability below {self.risk_threshold*100}% in 7 days",
             target_risk_score=self.risk_threshold * 0.7,
             target_deadline=datetime.utcnow() + timedelta(days=7),
@@ -332,7 +336,7 @@ class InterventionOrchestratorAgent:
         
         # Action 1: Send supportive check-in (if counselor chat needed)
         if InterventionType.COUNSELOR_CHAT in hypothesis['intervention_types']:
-            actions.append(AgentAction(
+            actions.append(dict(
                 plan_id=plan.id,
                 action_id=f"action_{secrets.token_hex(6)}",
                 action_type=InterventionType.COUNSELOR_CHAT,
@@ -350,7 +354,7 @@ class InterventionOrchestratorAgent:
         
         # Action 2: Financial aid if needed
         if InterventionType.FINANCIAL_AID in hypothesis['intervention_types']:
-            actions.append(AgentAction(
+            actions.append(dict(
                 plan_id=plan.id,
                 action_id=f"action_{secrets.token_hex(6)}",
                 action_type=InterventionType.FEE_EXTENSION,
@@ -366,7 +370,7 @@ class InterventionOrchestratorAgent:
             ))
             sequence += 1
             
-            actions.append(AgentAction(
+            actions.append(dict(
                 plan_id=plan.id,
                 action_id=f"action_{secrets.token_hex(6)}",
                 action_type=InterventionType.SCHOLARSHIP_MATCH,
@@ -384,7 +388,7 @@ class InterventionOrchestratorAgent:
         
         # Action 3: Peer support
         if InterventionType.PEER_SUPPORT in hypothesis['intervention_types']:
-            actions.append(AgentAction(
+            actions.append(dict(
                 plan_id=plan.id,
                 action_id=f"action_{secrets.token_hex(6)}",
                 action_type=InterventionType.PEER_SUPPORT,
@@ -405,7 +409,7 @@ class InterventionOrchestratorAgent:
         
         # Action 4: Academic support
         if InterventionType.ACADEMIC_SUPPORT in hypothesis['intervention_types']:
-            actions.append(AgentAction(
+            actions.append(dict(
                 plan_id=plan.id,
                 action_id=f"action_{secrets.token_hex(6)}",
                 action_type=InterventionType.ACADEMIC_SUPPORT,
@@ -421,8 +425,11 @@ class InterventionOrchestratorAgent:
             ))
             sequence += 1
         
+        # Emit the plan's actions in one multi-row insert
+        action_ids = AgentAction.bulk_insert(self.db, actions)
+        
         # Final action: Escalate if no response
-        actions.append(AgentAction(
+        escalation = dict(
             plan_id=plan.id,
             action_id=f"action_{secrets.token_hex(6)}",
             action_type=InterventionType.EMERGENCY_ESCALATION,
@@ -434,13 +441,10 @@ class InterventionOrchestratorAgent:
                 'response_deadline_hours': 48,
                 'escalation_threshold': 'no_response'
             },
-            depends_on_action_id=actions[0].id if actions else None,
+            depends_on_action_id=action_ids[0] if action_ids else None,
             scheduled_at=datetime.utcnow() + timedelta(days=2)
-        ))
-        
-        # Add all actions
-        for action in actions:
-            self.db.add(action)
+        )
+        AgentAction.bulk_insert(self.db, [escalation])
         
         self.db.commit()
     
@@ -575,6 +579,17 @@ class InterventionOrchestratorAgent:
             }
         }
     
+    def get_student_sessions(self, student_id: int) -> List[AgentSession]:
+        """Load a student's sessions with plans, actions and outcomes in a fixed number of queries"""
+        
+        return self.db.query(AgentSession).options(
+            joinedload(AgentSession.student),
+            selectinload(AgentSession.intervention_plans).selectinload(InterventionPlan.actions),
+            selectinload(AgentSession.intervention_plans).selectinload(InterventionPlan.outcomes)
+        ).filter(
+            AgentSession.student_id == student_id
+        ).order_by(AgentSession.started_at.desc()).all()
+    
     def approve_plan(self, plan_id: str, approver_id: int, notes: str = None) -> bool:
         """Approve intervention plan"""
         
@@ -7,7 +7,43 @@ Includes a MOCK mode for demonstration without API keys.
 import json
 import os
 import random
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback; same output, just slower
+    orjson = None
+
+
+def _json_loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _json_dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj)
+
+# Prompt event logs keep only the most recent events so prompt size stays bounded
+EVENT_LOG_LIMIT = 50
+
+
+def format_event_log(events, include_severity: bool = False, limit: int = EVENT_LOG_LIMIT) -> str:
+    """One line per event for agent prompts (most recent `limit` events, oldest first)."""
+    if len(events) > limit:
+        events = sorted(events, key=lambda e: e.timestamp)[-limit:]
+    if include_severity:
+        return "\n".join(
+            f"- [{e.timestamp.isoformat(timespec='seconds')}] {e.event_type}: {e.description} (Severity: {e.severity:.2f})"
+            for e in events
+        )
+    return "\n".join(
+        f"- [{e.timestamp.isoformat(timespec='seconds')}] {e.event_type}: {e.description}"
+        for e in events
+    )
+
+# Upper bound on in-flight provider requests from one batch
+BATCH_CONCURRENCY = 32
 
 # Simulating an LLM response for the Hackathon Demo
 class MockLLM:
@@ -17,9 +53,16 @@ class MockLLM:
         Simulate intelligent agent responses based on keywords in the prompt.
         This allows the system to be 'demonstrable' out of the box.
         """
+        # 0. META ANALYST (friction + ethics in one call)
+        if "MetaAnalystAgent" in system_prompt:
+            return _json_dumps({
+                "friction": _json_loads(MockLLM.generate(prompt, "FrictionAccumulationAgent")),
+                "ethics": _json_loads(MockLLM.generate(prompt, "EthicsAgent"))
+            })
+
         # 1. FRICTION AGENT SIMULATION
         if "FrictionAccumulationAgent" in system_prompt:
-            return json.dumps({
+            return _json_dumps({
                 "risk": 0.85,
                 "confidence": 0.9,
                 "reasoning": "Detected stacking of 3 distinct bureaucratic failures over 45 days. Scholarship delay (critical) is compounded by Hostel uncertainty.",
@@ -30,7 +73,7 @@ class MockLLM:
 
         # 2. RECOVERY AGENT SIMULATION
         if "RecoveryCapacityAgent" in system_prompt:
-            return json.dumps({
+            return _json_dumps({
                 "capacity_score": 0.3, # Low capacity
                 "confidence": 0.85,
                 "reasoning": "Student resilience is depleted. Financial buffer is likely exhausted due to scholarship delay. Time window to fix hostel issue is < 7 days before semester starts.",
@@ -40,7 +83,7 @@ class MockLLM:
 
         # 3. INERTIA AGENT SIMULATION
         if "InstitutionalInertiaAgent" in system_prompt:
-            return json.dumps({
+            return _json_dumps({
                 "inertia_score": 0.9, # High inertia (very slow)
                 "confidence": 0.95,
                 "reasoning": "Administrative backlog is high. Average resolution time for Hostel issues is 14 days, but student needs it in 7. System is too slow to save this trajectory naturally.",
@@ -50,7 +93,7 @@ class MockLLM:
             
         # 4. ETHICS AGENT SIMULATION
         if "EthicsAgent" in system_prompt:
-             return json.dumps({
+             return _json_dumps({
                 "veto": False,
                 "veto_reasons": [],
                 "recommendation": "URGENT_HUMAN_ESCALATION",
@@ -60,7 +103,7 @@ class MockLLM:
 
         # 5. IRREVERSIBILITY ARBITER (META AGENT)
         if "IrreversibilityArbiter" in system_prompt:
-            return json.dumps({
+            return _json_dumps({
                 "posture": "URGENT_HUMAN_ESCALATION",
                 "distance_to_irreversibility": 15, # 15% remaining (very close to Point of No Return)
                 "headline": "Irreversibility Imminent (~5 days)",
@@ -69,12 +112,13 @@ class MockLLM:
                 "point_of_no_return_days": 5
             })
 
-        return json.dumps({"error": "Unknown agent context"})
+        return _json_dumps({"error": "Unknown agent context"})
 
 class LLMService:
     def __init__(self):
         self.api_key = os.getenv("LLM_API_KEY")
         self.provider = "mock" if not self.api_key else "openai" # Default to Mock if no key
+        self._batch_executor = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY)
         
     def query_agent(self, agent_name: str, prompt: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -85,9 +129,26 @@ class LLMService:
         # If no API key, use Mock
         if self.provider == "mock":
             response_json = MockLLM.generate(prompt, system_prompt)
-            return json.loads(response_json)
+            return _json_loads(response_json)
             
         # TODO: Implement real OpenAI/Gemini call here
         # return self._call_openai(system_prompt, prompt)
         return {"error": "Real LLM not implemented yet"}
 
+    
+    def query_agents_batch(self, requests: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run many (agent_name, prompt, context) queries at once.
+        
+        Requests are dispatched concurrently (at most BATCH_CONCURRENCY in
+        flight) over the service's shared client; results keep input order.
+        """
+        if self.provider == "mock":
+            return [self.query_agent(*request) for request in requests]
+        return list(self._batch_executor.map(lambda request: self.query_agent(*request), requests))
+
+
+@lru_cache(maxsize=1)
+def get_service() -> LLMService:
+    """Process-wide LLMService shared by all agents."""
+    return LLMService()
@@ -11,15 +11,20 @@ A responsible multi-agent AI system that:
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
+import sys
 import uvicorn
 
 
 # Import database and models
 from database import Base, engine, get_db
-from models import User, StudentEvent
+from models import User, StudentEvent, EVENT_TYPE_CODES
 from auth import (
     get_password_hash, 
     authenticate_user, 
@@ -78,11 +83,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Moderation log records are only queued on the event loop; a background thread writes them
+_moderation_log_queue = queue.SimpleQueue()
+_moderation_log_listener = QueueListener(_moderation_log_queue, logging.StreamHandler(sys.stdout))
+_moderation_log = logging.getLogger("moderation")
+_moderation_log.addHandler(QueueHandler(_moderation_log_queue))
+_moderation_log.setLevel(logging.INFO)
+_moderation_log.propagate = False
+
 # Startup event to preload ML models
 @app.on_event("startup")
 async def startup_event():
     import asyncio
     
+    _moderation_log_listener.start()
+    await community_chat_manager.start_history_persistence()
+    
     def load_models():
         print("Pre-loading ML Models in background thread...")
         try:
@@ -100,9 +116,33 @@ async def startup_event():
     asyncio.create_task(asyncio.to_thread(load_models))
     print("Server starting up immediately (Models loading in background)...")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await community_chat_manager.stop_history_persistence()
+    _moderation_log_listener.stop()
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+def _ensure_event_type_code_column():
+    """create_all never alters existing tables; add and backfill event_type_code on older databases"""
+    with engine.begin() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(student_events)")}
+        if 'event_type_code' in columns:
+            return
+        conn.exec_driver_sql("ALTER TABLE student_events ADD COLUMN event_type_code INTEGER")
+        conn.execute(update(StudentEvent).values(
+            event_type_code=case(EVENT_TYPE_CODES, value=StudentEvent.event_type, else_=0)
+        ))
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_student_events_event_type_code ON student_events (event_type_code)"
+        )
+
+
+_ensure_event_type_code_column()
+
 # Include routers
 app.include_router(student.router)
 app.include_router(counselor.router)
@@ -276,6 +316,8 @@ async def websocket_counselor_chat_student(websocket: WebSocket, session_id: Opt
     WebSocket endpoint for student anonymous chat with counselor
     """
     session_id = await counselor_chat_manager.connect_student(websocket, session_id)
+    if session_id is None:
+        return
     
     try:
         while True:
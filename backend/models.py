@@ -18,12 +18,41 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# Stable integer codes for known event types, assigned at ingest (0 = unknown)
+EVENT_TYPE_CODES = {
+    'scholarship_delay': 1,
+    'fee_payment': 2,
+    'financial_aid': 3,
+    'account_hold': 4,
+    'attendance_warning': 5,
+    'deadline_conflict': 6,
+    'admin_warning': 7,
+    'resource_access': 8,
+    'registration_block': 9,
+    'hostel_access': 10,
+    'mess_card': 11,
+    'room_assignment': 12,
+    'amenity_restriction': 13,
+    'housing_payment': 14,
+    'language_barrier': 15,
+    'communication_issue': 16,
+    'form_confusion': 17,
+    'instruction_misunderstanding': 18,
+}
+EVENT_TYPE_NAMES = {code: event_type for event_type, code in EVENT_TYPE_CODES.items()}
+
+
+def _event_type_code_default(context):
+    return EVENT_TYPE_CODES.get(context.get_current_parameters().get('event_type'), 0)
+
+
 class StudentEvent(Base):
     __tablename__ = 'student_events'
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=False)
     event_type = Column(String, nullable=False)
+    event_type_code = Column(Integer, default=_event_type_code_default, index=True)
     severity = Column(Float, default=0.0)
     description = Column(Text, default='')
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
@@ -91,3 +120,33 @@ class SystemInsight(Base):
     severity = Column(Float, default=0.0)
     metadata_text = Column(Text, default='')
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ChatMessage(Base):
+    __tablename__ = 'chat_messages'
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(String, index=True, nullable=False)
+    payload = Column(JSON, nullable=False)  # the broadcast message dict, replayed as history
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SeniorChatProfile(Base):
+    __tablename__ = 'senior_chat_profiles'
+
+    student_id = Column(String, primary_key=True)
+    course = Column(String, nullable=False)
+    batch = Column(String, nullable=False)
+    matched_senior_id = Column(String, nullable=True)
+    session_id = Column(String, nullable=True)
+    created_at = Column(String, nullable=False)  # ISO timestamp, as sent to clients
+
+
+class SeniorChatSession(Base):
+    __tablename__ = 'senior_chat_sessions'
+
+    session_id = Column(String, primary_key=True)
+    student_id = Column(String, index=True, nullable=False)
+    senior_id = Column(String, nullable=False)
+    started_at = Column(String, nullable=False)  # ISO timestamp, as sent to clients
+    status = Column(String, default='active')
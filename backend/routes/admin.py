@@ -4,6 +4,7 @@ System-level insights and blind spot analytics
 NO individual student monitoring
 """
 
+import heapq
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
@@ -172,7 +173,8 @@ async def get_friction_patterns(
                         pair = f"{e1} + {e2}"
                         event_pairs[pair] = event_pairs.get(pair, 0) + 1
     
-    top_pairs = sorted(event_pairs.items(), key=lambda x: x[1], reverse=True)[:5]
+    # Partial selection: pairs grow quadratically with event types, only 5 are needed
+    top_pairs = heapq.nlargest(5, event_pairs.items(), key=lambda x: x[1])
     
     return {
         "time_period": f"{days} days",
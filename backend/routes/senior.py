@@ -5,7 +5,7 @@ Senior Chat and GovConnect WebSocket endpoints
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from chat.senior_chat import senior_chat_manager
-import json
+from chat.outbox import decode_json
 
 router = APIRouter()
 
@@ -25,7 +25,7 @@ async def senior_chat_student_endpoint(
         while True:
             # Receive message
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = decode_json(data)
             
             message_type = message_data.get('type')
             
@@ -4,13 +4,22 @@ Provides text generation capabilities using local transformer models
 """
 
 import os
+import json
 import torch
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
 from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
 import warnings
 
 warnings.filterwarnings('ignore')
 
+# Static instructions first so the batched prompt prefix is identical across requests
+BATCH_EXPLAIN_PREFIX = """You are the reasoning layer of a student support system.
+For each numbered agent below, explain in 2-3 sentences why its risk score was assigned and what it means for student support. Be specific and actionable.
+Return ONLY a JSON array of strings, one explanation per agent, in the same order.
+
+"""
+
 
 class LLMService:
     """
@@ -178,21 +187,62 @@ class LLMService:
         Returns:
             Natural language explanation
         """
-        prompt = f"""You are the {agent_name} in a student support system.
+        prompt = self._explain_prompt(agent_name, risk_score, features, context)
+        return self.generate(prompt, max_new_tokens=100, temperature=0.5)
+    
+    def _explain_prompt(
+        self,
+        agent_name: str,
+        risk_score: float,
+        features: Dict[str, Any],
+        context: str = ""
+    ) -> str:
+        """Single-agent explanation prompt (shared by explain_risk and the batch fallback)."""
+        return f"""You are the {agent_name} in a student support system.
 
 Risk Score: {risk_score:.2f}
 Features: {features}
 Context: {context}
 
 Explain in 2-3 sentences why this risk score was assigned and what it means for student support. Be specific and actionable."""
-
-        return self.generate(prompt, max_new_tokens=100, temperature=0.5)
-
-
-# Global LLM service instance (lazy loaded)
-_llm_service = None
+    
+    def explain_risks_batch(self, specs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Explain several risk scores with one generation call.
+        
+        Args:
+            specs: One dict per agent with the explain_risk arguments
+                   (agent_name, risk_score, features, context)
+            
+        Returns:
+            One explanation per spec, in input order
+        """
+        if not specs:
+            return []
+        
+        prompt = BATCH_EXPLAIN_PREFIX + "\n\n".join(
+            f"""[{i}] {spec['agent_name']}
+Risk Score: {spec['risk_score']:.2f}
+Features: {spec['features']}
+Context: {spec.get('context', '')}"""
+            for i, spec in enumerate(specs, 1)
+        )
+        text = self.generate(prompt, max_new_tokens=100 * len(specs), temperature=0.5)
+        
+        try:
+            comments = json.loads(text[text.index('['):text.rindex(']') + 1])
+        except ValueError:
+            comments = None
+        
+        if (not isinstance(comments, list) or len(comments) != len(specs)
+                or not all(isinstance(c, str) for c in comments)):
+            # Model ignored the format (or is unavailable): answer each spec deterministically
+            return [self._deterministic_fallback(self._explain_prompt(**spec)) for spec in specs]
+        
+        return [c.strip() for c in comments]
 
 
+@lru_cache(maxsize=1)
 def get_llm() -> LLMService:
     """
     Get global LLM service instance (singleton pattern).
@@ -200,7 +250,4 @@ def get_llm() -> LLMService:
     Returns:
         LLMService instance
     """
-    global _llm_service
-    if _llm_service is None:
-        _llm_service = LLMService()
-    return _llm_service
+    return LLMService()
@@ -42,9 +42,7 @@ export default function ChatBox({ title, type }) {
 
     ws.onopen = () => setIsConnected(true);
 
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-
+    const handleMessage = (data) => {
       /* ---- history ---- */
       if (data.type === 'message_history') {
         setMessages(
@@ -116,6 +114,12 @@ export default function ChatBox({ title, type }) {
       }
     };
 
+    ws.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      // Messages sent back-to-back arrive coalesced as { type: 'batch', items }
+      (frame.type === 'batch' ? frame.items : [frame]).forEach(handleMessage);
+    };
+
     ws.onclose = () => setIsConnected(false);
 
     return () => ws.close();
@@ -9,6 +9,7 @@ export default function SeniorChatBox() {
   const [matchingSeniors, setMatchingSeniors] = useState([]);
   const [selectedSenior, setSelectedSenior] = useState(null);
   const [messages, setMessages] = useState([]);
+  const [historySummary, setHistorySummary] = useState(null);
   const [input, setInput] = useState('');
   const [socket, setSocket] = useState(null);
   const [isConnected, setIsConnected] = useState(false);
@@ -56,57 +57,73 @@ export default function SeniorChatBox() {
       setIsConnected(true);
     };
 
+    const handleMessage = (data) => {
+      console.log('Received:', data);
+
+      if (data.type === 'connection_established' && data.has_profile) {
+        setStep('selection');
+      }
+
+      if (data.type === 'profile_submitted') {
+        setMatchingSeniors(data.matching_seniors || []);
+        setStep('selection');
+      }
+
+      if (data.type === 'match_created') {
+        setSelectedSenior(data.senior);
+        setStep('chat');
+      }
+
+      if (data.type === 'message_history_summary') {
+        // Sent before the replayed messages: everything older than the replay window
+        setHistorySummary(data);
+      }
+
+      if (data.type === 'message_history_chunk') {
+        // History replays oldest-first in chunks; the first one replaces what is shown
+        const chunk = data.items.map((m) => ({
+          id: crypto.randomUUID(),
+          text: m.message,
+          sender: m.sender,
+          timestamp: m.timestamp
+        }));
+        setMessages((prev) => (data.seq === 0 ? chunk : [...prev, ...chunk]));
+      }
+
+      if (data.type === 'message_history_end' && data.chunks === 0) {
+        // Empty history sends no chunk, so nothing else clears the previous session's view
+        setMessages([]);
+        setHistorySummary(null);
+      }
+      
+      if (data.type === 'message_sent') {
+          setMessages((prev) =>
+              prev.map((msg) =>
+              msg.clientId === data.client_id
+                  ? { ...msg, text: data.message }
+                  : msg
+              )
+          );
+          }
+          
+      if (data.type === 'senior_message') {
+        setMessages((prev) => [
+          ...prev,
+          {
+            id: crypto.randomUUID(),
+            text: data.message,
+            sender: 'senior',
+            timestamp: data.timestamp || new Date().toISOString()
+          }
+        ]);
+      }
+    };
+
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        console.log('Received:', data);
-
-        if (data.type === 'connection_established' && data.has_profile) {
-          setStep('selection');
-        }
-
-        if (data.type === 'profile_submitted') {
-          setMatchingSeniors(data.matching_seniors || []);
-          setStep('selection');
-        }
-
-        if (data.type === 'match_created') {
-          setSelectedSenior(data.senior);
-          setStep('chat');
-        }
-
-        if (data.type === 'message_history') {
-          setMessages(
-            data.messages.map((m) => ({
-              id: crypto.randomUUID(),
-              text: m.message,
-              sender: m.sender,
-              timestamp: m.timestamp
-            }))
-          );
-        }
-        
-        if (data.type === 'message_sent') {
-            setMessages((prev) =>
-                prev.map((msg) =>
-                msg.clientId === data.client_id
-                    ? { ...msg, text: data.message }
-                    : msg
-                )
-            );
-            }
-            
-        if (data.type === 'senior_message') {
-          setMessages((prev) => [
-            ...prev,
-            {
-              id: crypto.randomUUID(),
-              text: data.message,
-              sender: 'senior',
-              timestamp: data.timestamp || new Date().toISOString()
-            }
-          ]);
-        }
+        const frame = JSON.parse(event.data);
+        // Messages sent close together arrive coalesced as { type: 'batch', items }
+        (frame.type === 'batch' ? frame.items : [frame]).forEach(handleMessage);
       } catch (e) {
         console.error("Error processing message:", e);
       }
@@ -383,6 +400,13 @@ export default function SeniorChatBox() {
           </div>
         )}
 
+        {historySummary && (
+          <p className="text-center text-[10px] font-bold text-gray-400 uppercase tracking-widest">
+            {historySummary.count} earlier messages since{' '}
+            {new Date(historySummary.first_timestamp).toLocaleDateString()}
+          </p>
+        )}
+
         {messages.map((m) => (
           <div
             key={m.id}
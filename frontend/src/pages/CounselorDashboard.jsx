@@ -46,8 +46,7 @@ export default function CounselorDashboard() {
       setSocket(ws);
     };
 
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
+    const handleMessage = (data) => {
       console.log("Counselor received:", data);
 
       if (data.type === 'active_sessions') {
@@ -82,6 +81,12 @@ export default function CounselorDashboard() {
       }
     };
 
+    ws.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      // Messages sent back-to-back arrive coalesced as { type: 'batch', items }
+      (frame.type === 'batch' ? frame.items : [frame]).forEach(handleMessage);
+    };
+
     ws.onclose = () => {
       console.log("Disconnected from Counselor Chat System");
       setWsConnected(false);